@@ -0,0 +1,193 @@
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from enum import IntEnum
+
+from metrics import metrics
+
+class Priority(IntEnum):
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+# Baseline class per department: reading-room outages stall diagnostic work,
+# peripheral configuration questions can wait.
+DEPARTMENT_PRIORITY = {
+    "Hospital Reading Rooms": Priority.HIGH,
+    "Virtual HelpDesk": Priority.NORMAL,
+    "WCINYP IT": Priority.NORMAL,
+    "Radiqal": Priority.LOW,
+}
+
+URGENCY_PATTERN = re.compile(
+    r"\b(urgent|asap|stat|emergency|emergent|outage|down|crash(?:ed|es|ing)?|"
+    r"freez(?:e|es|ing)|froze|frozen|patients?|trauma|stroke|"
+    r"can'?t (?:read|open|load|dictate)|cannot (?:read|open|load|dictate)|won'?t (?:open|load))\b",
+    re.IGNORECASE,
+)
+
+def is_urgent(text: str) -> bool:
+    return URGENCY_PATTERN.search(text) is not None
+
+def classify_priority(text: str, department: str | None = None) -> Priority:
+    base = DEPARTMENT_PRIORITY.get(department, Priority.NORMAL)
+    if is_urgent(text):
+        return Priority(max(base - 1, Priority.CRITICAL))
+    return base
+
+# Longest a request of each class may queue before it is shed (None: never).
+DEFAULT_MAX_WAIT = {
+    Priority.CRITICAL: None,
+    Priority.HIGH: 10.0,
+    Priority.NORMAL: 5.0,
+    Priority.LOW: 2.0,
+}
+
+class AdmissionRejected(RuntimeError):
+    pass
+
+class _Waiter:
+    __slots__ = ("priority", "deadline", "seq", "future", "granted", "abandoned")
+
+    def __init__(self, priority: Priority, deadline: float, seq: int):
+        self.priority = priority
+        self.deadline = deadline
+        self.seq = seq
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.granted = False
+        self.abandoned = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.deadline, self.seq) < (other.priority, other.deadline, other.seq)
+
+class AdmissionController:
+    # A shared budget of concurrent LLM-bound operations. Waiters are served
+    # by priority class, then earliest deadline; a waiter whose deadline
+    # passes is shed so the caller can degrade instead of queueing forever.
+    # `reserve` slots are only ever handed to critical work. Sessions sit on
+    # different threads and loops, so grants travel via concurrent futures.
+    def __init__(self, capacity: int = 16, reserve: int = 4, max_wait: dict[Priority, float | None] | None = None):
+        self.capacity = capacity
+        self.reserve = min(reserve, capacity - 1)
+        self.max_wait = max_wait or dict(DEFAULT_MAX_WAIT)
+        self._lock = threading.Lock()
+        self._heap: list[_Waiter] = []
+        self._seq = itertools.count()
+        self.in_use = 0
+        self.waiting = {p: 0 for p in Priority}
+        metrics.add_collector(self._gauges)
+
+    def _gauges(self) -> dict[str, float]:
+        gauges = {"radbit_admission_in_use": self.in_use}
+        for p, n in self.waiting.items():
+            gauges[f"radbit_admission_queue_depth_{p.name.lower()}"] = n
+        return gauges
+
+    def _limit(self, priority: Priority) -> int:
+        return self.capacity if priority == Priority.CRITICAL else self.capacity - self.reserve
+
+    def _grant_waiters(self) -> list[_Waiter]:
+        # Called with the lock held.
+        granted = []
+        while self._heap:
+            top = self._heap[0]
+            if top.abandoned:
+                heapq.heappop(self._heap)
+                continue
+            if self.in_use >= self._limit(top.priority):
+                break
+            heapq.heappop(self._heap)
+            top.granted = True
+            self.waiting[top.priority] -= 1
+            self.in_use += 1
+            granted.append(top)
+        return granted
+
+    async def acquire(self, priority: Priority, work: str = "llm", max_wait: float | None = None):
+        if max_wait is None:
+            max_wait = self.max_wait.get(priority)
+        start = time.monotonic()
+        with self._lock:
+            ahead = any(not w.abandoned and w.priority <= priority for w in self._heap)
+            if not ahead and self.in_use < self._limit(priority):
+                self.in_use += 1
+                metrics.observe("radbit_admission_wait_seconds", 0.0, priority=priority.name.lower())
+                return
+            if max_wait is not None and max_wait <= 0:
+                waiter = None
+            else:
+                deadline = start + max_wait if max_wait is not None else float("inf")
+                waiter = _Waiter(priority, deadline, next(self._seq))
+                heapq.heappush(self._heap, waiter)
+                self.waiting[priority] += 1
+        if waiter is None:
+            self._shed(priority, work)
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(waiter.future)), max_wait)
+        except BaseException as e:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    waiter.abandoned = True
+                    self.waiting[priority] -= 1
+            if granted and isinstance(e, asyncio.TimeoutError):
+                # The grant raced the timeout; keep the slot.
+                pass
+            elif granted:
+                self.release()
+                raise
+            elif isinstance(e, asyncio.TimeoutError):
+                self._shed(priority, work)
+            else:
+                raise
+        metrics.observe("radbit_admission_wait_seconds", time.monotonic() - start, priority=priority.name.lower())
+
+    def _shed(self, priority: Priority, work: str):
+        metrics.inc("radbit_admission_shed_total", priority=priority.name.lower(), work=work)
+        raise AdmissionRejected(f"no LLM capacity for {priority.name.lower()} {work}")
+
+    def release(self):
+        with self._lock:
+            self.in_use -= 1
+            granted = self._grant_waiters()
+        for waiter in granted:
+            waiter.future.set_result(True)
+
+    def gate(self, priority: Priority, work: str = "llm", max_wait: float | None = None) -> "_Gate":
+        return _Gate(self, priority, work, max_wait)
+
+class _Gate:
+    def __init__(self, controller: AdmissionController, priority: Priority, work: str, max_wait: float | None):
+        self._controller = controller
+        self.priority = priority
+        self.work = work
+        self.max_wait = max_wait
+
+    async def __aenter__(self):
+        await self._controller.acquire(self.priority, self.work, self.max_wait)
+
+    async def __aexit__(self, *exc):
+        self._controller.release()
+        return False
+
+def _max_wait_from_env() -> dict[Priority, float | None]:
+    waits = {}
+    for p, default in DEFAULT_MAX_WAIT.items():
+        raw = os.environ.get(f"RADBIT_ADMISSION_WAIT_{p.name}")
+        waits[p] = default if raw is None else (None if raw.lower() in ("", "none", "inf") else float(raw))
+    return waits
+
+def _from_env() -> AdmissionController:
+    return AdmissionController(
+        capacity=int(os.environ.get("RADBIT_ADMISSION_SLOTS", 16)),
+        reserve=int(os.environ.get("RADBIT_ADMISSION_RESERVE", 4)),
+        max_wait=_max_wait_from_env(),
+    )
+
+admission = _from_env()
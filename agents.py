@@ -31,6 +31,9 @@ class Runner:
     async def run(agent: Agent, input_data: Any, context: Any = None) -> RunResult:
         # Mock behavior: map input strings to dummy departments
         message = input_data.strip().lower()
+        if agent.output_type is not None and "is_off_topic" in getattr(agent.output_type, "model_fields", {}):
+            off_topic = any(kw in message for kw in ["meaning of life", "philosoph", "existential"])
+            return RunResult(final_output=agent.output_type(is_off_topic=off_topic, explanation="mock"), last_used_agent=agent)
         if "freeze" in message or "crash" in message:
             return RunResult(final_output=DummyLabel("Hospital Reading Rooms"), last_used_agent=agent)
         elif "login" in message or "certificate" in message:
@@ -0,0 +1,187 @@
+import re
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DEFAULT_TZ = "America/New_York"
+
+_DASH = r"\s*[–\-]\s*"
+_TIME = r"\d{1,2}(?::\d{2})?\s*[AP]M"
+_TWENTY_FOUR_SEVEN = re.compile(r"24/7")
+_DAY_RANGE = re.compile(rf"\b({'|'.join(DAYS)})(?:{_DASH}({'|'.join(DAYS)}))?\b")
+_TIME_RANGE = re.compile(rf"({_TIME}){_DASH}({_TIME})", re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def holiday_dates(year: int, country: str = "US") -> frozenset[date]:
+    import holidays
+    return frozenset(holidays.country_holidays(country, years=year).keys())
+
+def is_holiday(day: date, country: str = "US") -> bool:
+    return day in holiday_dates(day.year, country)
+
+def _minutes(t: str) -> int:
+    t = re.sub(r"\s", "", t).upper()
+    fmt = "%I:%M%p" if ":" in t else "%I%p"
+    parsed = datetime.strptime(t, fmt)
+    return parsed.hour * 60 + parsed.minute
+
+def _merge(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _weekly(days: list[int], start: int, end: int) -> list[tuple[int, int]]:
+    out = []
+    for d in days:
+        s = d * MINUTES_PER_DAY + start
+        e = d * MINUTES_PER_DAY + end + (MINUTES_PER_DAY if end <= start else 0)
+        if e > MINUTES_PER_WEEK:
+            out += [(s, MINUTES_PER_WEEK), (0, e - MINUTES_PER_WEEK)]
+        else:
+            out.append((s, e))
+    return out
+
+def parse_schedule_fragment(text: str) -> tuple[list[tuple[int, int]], bool] | None:
+    # Returns weekly intervals and whether they still apply on holidays.
+    if _TWENTY_FOUR_SEVEN.search(text):
+        return [(0, MINUTES_PER_WEEK)], True
+    times = _TIME_RANGE.search(text)
+    if not times:
+        return None
+    days = list(range(7))
+    span = _DAY_RANGE.search(text[:times.start()])
+    if span:
+        first = DAYS.index(span.group(1))
+        last = DAYS.index(span.group(2) or span.group(1))
+        days = [(first + i) % 7 for i in range((last - first) % 7 + 1)]
+    return _weekly(days, _minutes(times.group(1)), _minutes(times.group(2))), False
+
+class Schedule:
+    def __init__(self, intervals: list[tuple[int, int]], holiday_intervals: list[tuple[int, int]],
+                 tz: str = DEFAULT_TZ, known: bool = True):
+        self.intervals = _merge(intervals)
+        self.holiday_intervals = _merge(holiday_intervals)
+        self.tz = ZoneInfo(tz)
+        self.known = known
+        self._starts = [s for s, _ in self.intervals]
+        self._holiday_starts = [s for s, _ in self.holiday_intervals]
+        self._arrays = None
+
+    @classmethod
+    def compile(cls, entry: dict, tz: str = DEFAULT_TZ) -> "Schedule":
+        # "See Above" and similar entries take their hours from the schedules
+        # quoted in the phone/email/other fields of the same entry.
+        fragments = [entry.get("hours", "")]
+        if not parse_schedule_fragment(fragments[0]):
+            fragments = [
+                part
+                for field in ("phone", "email", "other")
+                for part in re.findall(r"\(([^)]*)\)", entry.get(field, ""))
+            ]
+        intervals, holiday_intervals = [], []
+        for fragment in fragments:
+            parsed = parse_schedule_fragment(fragment)
+            if parsed:
+                intervals += parsed[0]
+                if parsed[1]:
+                    holiday_intervals += parsed[0]
+        if not intervals:
+            # Unknown hours ("Platform dependent") are treated as always open.
+            return cls([(0, MINUTES_PER_WEEK)], [(0, MINUTES_PER_WEEK)], tz, known=False)
+        return cls(intervals, holiday_intervals, tz)
+
+    def _local(self, when: datetime) -> datetime:
+        return when.astimezone(self.tz) if when.tzinfo else when.replace(tzinfo=self.tz)
+
+    @staticmethod
+    def _contains(starts: list[int], intervals: list[tuple[int, int]], minute: int) -> bool:
+        i = bisect_right(starts, minute) - 1
+        return i >= 0 and minute < intervals[i][1]
+
+    def is_open(self, when: datetime, holiday: bool | None = None) -> bool:
+        local = self._local(when)
+        minute = local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+        if holiday is None:
+            holiday = is_holiday(local.date())
+        if holiday:
+            return self._contains(self._holiday_starts, self.holiday_intervals, minute)
+        return self._contains(self._starts, self.intervals, minute)
+
+    def _bounds(self) -> tuple["np.ndarray", "np.ndarray"]:
+        # numpy is only needed for bulk queries; load it on the first one.
+        if self._arrays is None:
+            import numpy as np
+            self._arrays = (
+                np.array(self.intervals or [(0, 0)], dtype=np.int64),
+                np.array(self.holiday_intervals or [(0, 0)], dtype=np.int64),
+            )
+        return self._arrays
+
+    @staticmethod
+    def _contains_many(bounds: "np.ndarray", minutes: "np.ndarray") -> "np.ndarray":
+        import numpy as np
+        i = np.searchsorted(bounds[:, 0], minutes, side="right") - 1
+        return (i >= 0) & (minutes < bounds[np.maximum(i, 0), 1])
+
+    def is_open_many(self, times: list[datetime]) -> "np.ndarray":
+        import numpy as np
+        bounds, holiday_bounds = self._bounds()
+        local = [self._local(t) for t in times]
+        minutes = np.fromiter(
+            (t.weekday() * MINUTES_PER_DAY + t.hour * 60 + t.minute for t in local), dtype=np.int64, count=len(local)
+        )
+        holiday = np.fromiter((is_holiday(t.date()) for t in local), dtype=bool, count=len(local))
+        return np.where(
+            holiday,
+            self._contains_many(holiday_bounds, minutes),
+            self._contains_many(bounds, minutes),
+        )
+
+    def next_open(self, when: datetime, horizon_days: int = 14) -> datetime | None:
+        local = self._local(when).replace(second=0, microsecond=0)
+        if self.is_open(local):
+            return local
+        # Walk interval starts rather than minutes; holidays can skip a start.
+        day_start = local.replace(hour=0, minute=0)
+        week_start = day_start - timedelta(days=local.weekday())
+        for week in range(horizon_days // 7 + 2):
+            for start in self._starts + self._holiday_starts:
+                candidate = week_start + timedelta(weeks=week, minutes=start)
+                if local < candidate <= local + timedelta(days=horizon_days) and self.is_open(candidate):
+                    return candidate
+        return None
+
+class AvailabilityEngine:
+    def __init__(self, directory: dict[str, dict], tz: str = DEFAULT_TZ,
+                 fallbacks: dict[str, list[str]] | None = None):
+        self.schedules = {dept: Schedule.compile(entry, tz) for dept, entry in directory.items()}
+        self.fallbacks = fallbacks or {}
+
+    def is_open(self, dept: str, when: datetime, holiday: bool | None = None) -> bool:
+        return self.schedules[dept].is_open(when, holiday)
+
+    def is_open_many(self, dept: str, times: list[datetime]) -> "np.ndarray":
+        return self.schedules[dept].is_open_many(times)
+
+    def fallback_department(self, dept: str, when: datetime, holiday: bool | None = None) -> str | None:
+        # Walk the department's preference list and take the first one open
+        # now; if none is, the one that opens soonest. Departments without a
+        # list may fall back to any other, published hours first.
+        if dept in self.fallbacks:
+            candidates = [d for d in self.fallbacks[dept] if d != dept and d in self.schedules]
+        else:
+            candidates = sorted((d for d in self.schedules if d != dept), key=lambda d: not self.schedules[d].known)
+        for d in candidates:
+            if self.schedules[d].is_open(when, holiday):
+                return d
+        upcoming = [(self.schedules[d].next_open(when), i, d) for i, d in enumerate(candidates)]
+        upcoming = [u for u in upcoming if u[0] is not None]
+        return min(upcoming)[2] if upcoming else None
@@ -0,0 +1,108 @@
+import json
+import mmap
+import os
+import threading
+from abc import ABC, abstractmethod
+
+class BackendStore(ABC):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+
+    def _refresh(self):
+        st = os.stat(self.path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp != self._mtime:
+            with self._lock:
+                if stamp != self._mtime:
+                    self._load()
+                    self._mtime = stamp
+
+    @abstractmethod
+    def _load(self): ...
+
+    @abstractmethod
+    def _get(self, index: int) -> dict: ...
+
+    @abstractmethod
+    def _index_of_cwid(self, cwid: str) -> int | None: ...
+
+    @abstractmethod
+    def _len(self) -> int: ...
+
+    def get(self, index: int) -> dict:
+        self._refresh()
+        return self._get(index)
+
+    def get_by_cwid(self, cwid: str) -> dict | None:
+        self._refresh()
+        index = self._index_of_cwid(cwid)
+        return None if index is None else self._get(index)
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._len()
+
+class JsonBackendStore(BackendStore):
+    def _load(self):
+        with open(self.path, "r") as f:
+            records = json.load(f)
+        cwids = {r["user"]["cwid"]: i for i, r in enumerate(records) if r.get("user", {}).get("cwid")}
+        self._state = (records, cwids)
+
+    def _get(self, index: int) -> dict:
+        return self._state[0][index]
+
+    def _index_of_cwid(self, cwid: str) -> int | None:
+        return self._state[1].get(cwid)
+
+    def _len(self) -> int:
+        return len(self._state[0])
+
+class JsonlBackendStore(BackendStore):
+    # One record per line. Only the byte offsets and the cwid index stay in
+    # memory; records are decoded from the memory-mapped file on demand.
+    def _load(self):
+        offsets, cwids = [], {}
+        with open(self.path, "rb") as f:
+            pos = 0
+            for line in f:
+                if line.strip():
+                    cwid = json.loads(line).get("user", {}).get("cwid")
+                    if cwid:
+                        cwids[cwid] = len(offsets)
+                    offsets.append(pos)
+                pos += len(line)
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if pos else None
+        self._state = (offsets, cwids, mm)
+
+    def _get(self, index: int) -> dict:
+        offsets, _, mm = self._state
+        start = offsets[index]
+        end = mm.find(b"\n", start)
+        return json.loads(mm[start:end if end != -1 else len(mm)])
+
+    def _index_of_cwid(self, cwid: str) -> int | None:
+        return self._state[1].get(cwid)
+
+    def _len(self) -> int:
+        return len(self._state[0])
+
+_BACKENDS = {".json": JsonBackendStore, ".jsonl": JsonlBackendStore}
+_stores: dict[str, BackendStore] = {}
+_stores_lock = threading.Lock()
+
+def register_backend(extension: str, store_cls: type[BackendStore]):
+    _BACKENDS[extension] = store_cls
+
+def open_store(path: str) -> BackendStore:
+    key = os.path.abspath(path)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                ext = os.path.splitext(path)[1].lower()
+                store = _stores[key] = _BACKENDS.get(ext, JsonBackendStore)(path)
+    return store
@@ -0,0 +1,162 @@
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAQ_REPLY = [
+    {
+        "question": "Why does PACS freeze while I am reading?",
+        "steps": ["Close and reopen the study", "Restart the viewer"],
+        "input_example": "PACS viewer froze while reading a CT",
+    },
+    {
+        "question": "Why won't my VPN connect from home?",
+        "steps": ["Reboot your router", "Reinstall the VPN client"],
+        "input_example": "VPN will not connect from home",
+    },
+]
+EMAIL_REPLY = (
+    "To whom it may concern,\n\nI am writing to report an issue with my workstation that is "
+    "interrupting my work. I would appreciate any help you can offer.\n\nThank you"
+)
+
+class FakeOpenAIConfig:
+    def __init__(self, latency_ms: float = 300, jitter_ms: float = 100, failure_rate: float = 0.0,
+                 seed: int | None = None, label_confidence: float = 0.95, stream_token_ms: float = 5):
+        self.latency_ms = latency_ms
+        self.stream_token_ms = stream_token_ms
+        self.label_confidence = label_confidence
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+def _reply_for(messages: list[dict]) -> str:
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    if "groups them by technical theme" in system:
+        return json.dumps(FAQ_REPLY)
+    return EMAIL_REPLY
+
+def make_handler(config: FakeOpenAIConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_stream(self, request: dict, content: str, prompt_tokens: int, completion_tokens: int):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            base = {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o"),
+            }
+            pieces = [w + " " for w in content.split(" ")]
+            for piece in pieces:
+                chunk = {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(config.stream_token_ms / 1000)
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                     "total_tokens": prompt_tokens + completion_tokens}
+            self.wfile.write(f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            with config.lock:
+                config.requests += 1
+                delay = max(0.0, config.latency_ms + config.random.uniform(-config.jitter_ms, config.jitter_ms))
+                fail = config.random.random() < config.failure_rate
+            time.sleep(delay / 1000)
+
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"unsupported path {self.path}"}})
+                return
+            if fail:
+                self._send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+                return
+
+            logprobs = None
+            if request.get("logprobs"):
+                # Cascade label calls: always pick option A.
+                content = "A"
+                rest = (1 - config.label_confidence) / 4
+                logprobs = {"content": [{
+                    "token": "A",
+                    "logprob": math.log(config.label_confidence),
+                    "bytes": None,
+                    "top_logprobs": [
+                        {"token": t, "logprob": math.log(p), "bytes": None}
+                        for t, p in [("A", config.label_confidence), ("B", rest), ("C", rest), ("D", rest)]
+                    ],
+                }]}
+            else:
+                content = _reply_for(request.get("messages", []))
+            prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+            completion_tokens = len(content.split())
+            if request.get("stream"):
+                self._send_stream(request, content, prompt_tokens, completion_tokens)
+                return
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "logprobs": logprobs,
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+
+    return Handler
+
+def start_server(config: FakeOpenAIConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI chat completions API.")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--label-confidence", type=float, default=0.95)
+    args = parser.parse_args(argv)
+    config = FakeOpenAIConfig(args.latency_ms, args.jitter_ms, args.failure_rate,
+                              label_confidence=args.label_confidence)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(config))
+    print(f"Serving on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.fake_openai_server import FakeOpenAIConfig, start_server
+from benchmarks.workload import DEFAULT_BACKEND, Workload
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def summarize(latencies: list[float], elapsed: float, **extra) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "throughput_per_s": round(len(ordered) / elapsed, 3) if elapsed else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        **extra,
+    }
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def bench_single(radbit, workload: Workload, n: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for text, scenario in workload.tickets(n):
+        latencies.append(timed(radbit.triage_and_get_support_info, text, scenario))
+    return summarize(latencies, time.perf_counter() - start)
+
+def bench_concurrent(radbit, workload: Workload, sessions: int, per_session: int) -> dict:
+    # Each thread stands in for one Streamlit session's script thread.
+    jobs = workload.tickets(sessions * per_session)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        latencies = list(pool.map(lambda job: timed(radbit.triage_and_get_support_info, *job), jobs))
+    return summarize(latencies, time.perf_counter() - start, sessions=sessions)
+
+def bench_faq(radbit, workload: Workload, n: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(n):
+        latencies.append(timed(radbit.generate_faqs, workload.history(20)))
+    return summarize(latencies, time.perf_counter() - start)
+
+def bench_history(workload: Workload, n: int, tail: int = 20) -> dict:
+    from history_log import HistoryLog
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = HistoryLog(os.path.join(tmp, "history.jsonl"), legacy_path=None, compact_interval=float("inf"))
+        entries = workload.history(n)
+        appends, tails = [], []
+        start = time.perf_counter()
+        for i, entry in enumerate(entries, 1):
+            appends.append(timed(log.append, entry))
+            if i % max(1, n // 20) == 0:
+                tails.append(timed(log.tail, tail))
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(log.path)
+    result = summarize(appends, elapsed, file_bytes=size)
+    result["tail"] = summarize(tails, sum(tails))
+    return result
+
+def bench_startup(runs: int) -> dict:
+    # Each run is a cold interpreter with an empty triage cache.
+    samples: dict[str, list[float]] = {}
+    registry_report = {}
+    for i in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, RADBIT_TRIAGE_CACHE=os.path.join(tmp, "triage_cache.sqlite3"))
+            out = subprocess.check_output([sys.executable, "-m", "benchmarks.startup_probe"], env=env, text=True)
+        timings = json.loads(out)
+        registry_report = timings.pop("registry")
+        for name, ms in timings.items():
+            samples.setdefault(name, []).append(ms / 1000)
+    result = {name: summarize(values, sum(values)) for name, values in samples.items()}
+    result["registry_s"] = registry_report
+    # Headline percentiles are time to the first LLM-routed answer from a cold process.
+    totals = [sum(parts) for parts in zip(samples["import_ms"], samples["first_llm_triage_ms"])]
+    return {**summarize(totals, sum(totals)), **result}
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    print(f"{'scenario':<12} {'metric':<8} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            a, b = old.get(metric, 0), result.get(metric, 0)
+            change = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+            print(f"{name:<12} {metric:<8} {a:>10.2f} {b:>10.2f} {change:>8}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline latency benchmarks for RadBit.")
+    parser.add_argument("--scenarios", default="single,concurrent,faq,history")
+    parser.add_argument("--tickets", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--faq-runs", type=int, default=5)
+    parser.add_argument("--history-entries", type=int, default=5000)
+    parser.add_argument("--startup-runs", type=int, default=5)
+    parser.add_argument("--repeat-rate", type=float, default=0.5)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", default=None, help="previous results file to diff against")
+    args = parser.parse_args(argv)
+
+    config = FakeOpenAIConfig(args.latency_ms, args.jitter_ms, args.failure_rate, seed=args.seed)
+    server = start_server(config)
+    tmp = tempfile.mkdtemp(prefix="radbit-bench-")
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["RADBIT_TRIAGE_CACHE"] = os.path.join(tmp, "triage_cache.sqlite3")
+    os.environ.setdefault("RADBIT_BACKEND_PATH", DEFAULT_BACKEND)
+
+    import_start = time.perf_counter()
+    import radbit
+    import_ms = (time.perf_counter() - import_start) * 1000
+
+    workload = Workload(repeat_rate=args.repeat_rate, seed=args.seed)
+    selected = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    results = {}
+    for name in selected:
+        if name == "single":
+            results[name] = bench_single(radbit, workload, args.tickets)
+        elif name == "concurrent":
+            per_session = max(1, args.tickets // args.sessions)
+            results[name] = bench_concurrent(radbit, workload, args.sessions, per_session)
+        elif name == "faq":
+            results[name] = bench_faq(radbit, workload, args.faq_runs)
+        elif name == "history":
+            results[name] = bench_history(workload, args.history_entries)
+        elif name == "startup":
+            results[name] = bench_startup(args.startup_runs)
+        else:
+            parser.error(f"unknown scenario {name!r}")
+        print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "import_ms": round(import_ms, 3),
+        "upstream_requests": config.requests,
+        "scenarios": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    server.shutdown()
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import json
+import sys
+import time
+
+# Run in a fresh interpreter by the `startup` benchmark scenario: times the
+# radbit import, a first keyword-routed request and a first LLM-routed one.
+
+def main():
+    start = time.perf_counter()
+    import radbit
+    from registry import registry
+
+    timings = {"import_ms": (time.perf_counter() - start) * 1000}
+    t = time.perf_counter()
+    radbit.route_support_info("my gaming mouse speed is too fast", 0)
+    timings["first_keyword_route_ms"] = (time.perf_counter() - t) * 1000
+    t = time.perf_counter()
+    radbit.triage_and_get_support_info("the monitor on my home workstation flickers after login", 0)
+    timings["first_llm_triage_ms"] = (time.perf_counter() - t) * 1000
+    timings["registry"] = registry.report()
+    json.dump(timings, sys.stdout)
+
+if __name__ == "__main__":
+    main()
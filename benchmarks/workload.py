@@ -0,0 +1,50 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "tickets.txt")
+DEFAULT_BACKEND = os.path.join(os.path.dirname(HERE), "fake_backend_data.json")
+
+def load_corpus(path: str = DEFAULT_CORPUS) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def scenario_count(path: str = DEFAULT_BACKEND) -> int:
+    with open(path, "r") as f:
+        return len(json.load(f))
+
+class Workload:
+    def __init__(self, corpus: list[str] | None = None, scenarios: int | None = None,
+                 repeat_rate: float = 0.5, seed: int = 0):
+        self.corpus = corpus or load_corpus()
+        self.scenarios = scenarios or scenario_count()
+        self.repeat_rate = repeat_rate
+        self.random = random.Random(seed)
+        self._serial = 0
+
+    def ticket(self) -> tuple[str, int]:
+        # Roughly repeat_rate of tickets are verbatim corpus entries, the rest
+        # get a unique suffix so they miss every cache.
+        text = self.random.choice(self.corpus)
+        if self.random.random() >= self.repeat_rate:
+            self._serial += 1
+            text = f"{text} (ticket {self._serial})"
+        return text, self.random.randrange(self.scenarios)
+
+    def tickets(self, n: int) -> list[tuple[str, int]]:
+        return [self.ticket() for _ in range(n)]
+
+    def history(self, n: int, end: datetime | None = None) -> list[dict]:
+        end = end or datetime.now()
+        entries = []
+        for i in range(n):
+            text, _ = self.ticket()
+            entries.append({
+                "timestamp": (end - timedelta(seconds=(n - i) * 30)).strftime("%Y-%m-%d %H:%M:%S"),
+                "input": text,
+                "department": "WCINYP IT",
+                "contact_info": {"Department": "WCINYP IT"},
+            })
+        return entries
@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Iterator
+
+from agents import InputGuardrailTripwireTriggered
+from radbit import SUPPORT_DIRECTORY, aclassify_department, adraft_email_tier, load_backend_json
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc):
+        return False
+
+def read_tickets(path: str, text_field: str = "input", id_field: str = "id") -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for n, row in enumerate(rows):
+            yield {
+                "id": str(row.get(id_field) or n),
+                "input": (row.get(text_field) or "").strip(),
+                "name": row.get("name"),
+            }
+
+def completed_ids(output_path: str) -> set[str]:
+    done = set()
+    if os.path.exists(output_path):
+        with open(output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue
+                # Failed tickets, and ones routed or drafted by the degraded
+                # fallback while the upstream was unhealthy, are retried on
+                # resume.
+                if result.get("tier") not in ("error", "fallback") and result.get("email_tier") != "fallback":
+                    done.add(result["id"])
+    return done
+
+class BulkStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.done = 0
+        self.tiers = Counter()
+
+    def record(self, tier: str):
+        self.done += 1
+        self.tiers[tier] += 1
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "tickets": self.done,
+            "elapsed_s": round(elapsed, 3),
+            "tickets_per_s": round(self.done / elapsed, 2) if elapsed else 0.0,
+            "tiers": dict(self.tiers),
+        }
+
+async def triage_ticket(ticket: dict, limiter: TokenBucket | None, draft_email: bool,
+                        default_name: str) -> dict:
+    result = {"id": ticket["id"], "input": ticket["input"]}
+    try:
+        dept, tier = await aclassify_department(ticket["input"], rate_limiter=limiter)
+        if dept not in SUPPORT_DIRECTORY:
+            raise ValueError(f"Triage failed, got {dept!r}")
+        result.update(department=dept, tier=tier)
+        if draft_email:
+            result["email_draft"], result["email_tier"] = await adraft_email_tier(
+                ticket["input"], ticket["name"] or default_name, rate_limiter=limiter
+            )
+    except InputGuardrailTripwireTriggered:
+        result.update(department=None, tier="guardrail")
+    except Exception as e:
+        result.update(department=None, tier="error", error=str(e))
+    return result
+
+async def abulk_triage(tickets: Iterator[dict], output_path: str, concurrency: int = 16,
+                       rate: float | None = None, draft_email: bool = True, scenario_index: int = 0,
+                       progress_every: int = 500) -> dict:
+    done = completed_ids(output_path)
+    limiter = TokenBucket(rate) if rate else None
+    default_name = load_backend_json(index=scenario_index)["user"]["name"]
+    stats = BulkStats()
+    sem = asyncio.Semaphore(concurrency)
+    pending = set()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def run(ticket):
+            try:
+                result = await triage_ticket(ticket, limiter, draft_email, default_name)
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                stats.record(result["tier"])
+                if progress_every and stats.done % progress_every == 0:
+                    print(json.dumps(stats.summary()), file=sys.stderr)
+            finally:
+                sem.release()
+
+        for ticket in tickets:
+            if ticket["id"] in done or not ticket["input"]:
+                continue
+            # Acquire before creating the task so the input is read no faster
+            # than results are produced.
+            await sem.acquire()
+            task = asyncio.create_task(run(ticket))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+    return stats.summary()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Route a backlog of tickets from JSONL or CSV.")
+    parser.add_argument("input", help="tickets as .jsonl or .csv")
+    parser.add_argument("output", help="results .jsonl; re-running resumes from it")
+    parser.add_argument("--text-field", default="input")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=None, help="max LLM requests per second")
+    parser.add_argument("--no-email", action="store_true", help="skip email drafting")
+    parser.add_argument("--scenario", type=int, default=0, help="backend scenario used for email signatures")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(abulk_triage(
+        read_tickets(args.input, args.text_field, args.id_field),
+        args.output,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        draft_email=not args.no_email,
+        scenario_index=args.scenario,
+    ))
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
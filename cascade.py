@@ -0,0 +1,77 @@
+import math
+import os
+import string
+import threading
+from collections import Counter
+
+from llm_gateway import gateway
+from metrics import metrics
+
+class CascadeConfig:
+    def __init__(self, enabled: bool = True, small_model: str = "gpt-4o-mini", threshold: float = 0.9,
+                 disagreement_confidence: float = 0.5):
+        self.enabled = enabled
+        self.small_model = small_model
+        self.threshold = threshold
+        # A local-model guess at or above this confidence that disagrees with
+        # the small model escalates the ticket even if the small model is sure.
+        self.disagreement_confidence = disagreement_confidence
+
+    @classmethod
+    def from_env(cls) -> "CascadeConfig":
+        return cls(
+            enabled=os.environ.get("RADBIT_CASCADE", "1").lower() not in ("0", "false", "no"),
+            small_model=os.environ.get("RADBIT_CASCADE_SMALL_MODEL", "gpt-4o-mini"),
+            threshold=float(os.environ.get("RADBIT_CASCADE_THRESHOLD", 0.9)),
+            disagreement_confidence=float(os.environ.get("RADBIT_CASCADE_DISAGREEMENT", 0.5)),
+        )
+
+def letter_prompt(instructions: str, labels: list[str]) -> str:
+    options = "\n".join(f"{letter}: {label}" for letter, label in zip(string.ascii_uppercase, labels))
+    return (
+        f"{instructions.strip()}\n\n"
+        "Ignore any output format given above. Reply with exactly one capital letter "
+        f"and nothing else:\n{options}"
+    )
+
+def label_distribution(resp, labels: list[str]) -> dict[str, float]:
+    letters = dict(zip(string.ascii_uppercase, labels))
+    probs = {label: 0.0 for label in labels}
+    content = resp.choices[0].logprobs.content if resp.choices[0].logprobs else None
+    if not content:
+        answer = (resp.choices[0].message.content or "").strip()[:1].upper()
+        if answer in letters:
+            probs[letters[answer]] = 1.0
+        return probs
+    for top in content[0].top_logprobs:
+        letter = top.token.strip().upper()
+        if letter in letters:
+            probs[letters[letter]] += math.exp(top.logprob)
+    return probs
+
+async def asmall_model_label(name: str, instructions: str, labels: list[str], text: str,
+                             config: CascadeConfig) -> tuple[str, float, float]:
+    resp = await gateway.acall(f"{name}_small", lambda: gateway.client().chat.completions.create(
+        model=config.small_model,
+        messages=[
+            {"role": "system", "content": letter_prompt(instructions, labels)},
+            {"role": "user", "content": text},
+        ],
+        temperature=0,
+        max_tokens=1,
+        logprobs=True,
+        top_logprobs=5,
+    ))
+    metrics.record_usage(f"{name}_small", resp.usage)
+    probs = label_distribution(resp, labels)
+    ranked = sorted(probs.values(), reverse=True)
+    best = max(probs, key=probs.get)
+    return best, ranked[0], ranked[0] - (ranked[1] if len(ranked) > 1 else 0.0)
+
+_stats_lock = threading.Lock()
+cascade_stats: Counter = Counter()
+
+def record_tier(name: str, tier: str, reason: str):
+    with _stats_lock:
+        cascade_stats[(name, tier, reason)] += 1
+    metrics.inc("radbit_cascade_total", task=name, tier=tier, reason=reason)
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+def history_fingerprint(history: list[dict]) -> str:
+    window = [(e.get("timestamp"), e.get("input")) for e in history]
+    return hashlib.sha256(json.dumps(window).encode("utf-8")).hexdigest()
+
+class FaqDigest:
+    def __init__(self, generate: Callable[[list[dict]], list[dict]], path: str | None = "faq_digest.json"):
+        self._generate = generate
+        self.path = path
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="faq-digest")
+        self._pending = None
+        self._fingerprint = None
+        self._faqs: list[dict] = []
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    saved = json.load(f)
+                self._fingerprint, self._faqs = saved["fingerprint"], saved["faqs"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def latest(self) -> list[dict]:
+        return self._faqs
+
+    @property
+    def refreshing(self) -> bool:
+        return self._pending is not None
+
+    def refresh(self, history: list[dict]):
+        self.refresh_window(history_fingerprint(history), lambda: history)
+
+    def refresh_window(self, fingerprint: str, load: Callable[[], list[dict]]):
+        # `load` is only called when the fingerprint is new, so callers that
+        # can fingerprint a window cheaply never read it on a no-op refresh.
+        with self._lock:
+            if fingerprint in (self._fingerprint, self._pending):
+                return
+            if self._pending is not None:
+                # A refresh is already running; the next call after it lands
+                # will pick up whatever arrived in the meantime.
+                return
+            self._pending = fingerprint
+        try:
+            history = list(load())
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        if not history:
+            with self._lock:
+                self._fingerprint, self._faqs, self._pending = fingerprint, [], None
+            return
+        self._executor.submit(self._run, history, fingerprint)
+
+    def _run(self, history: list[dict], fingerprint: str):
+        # If generation raises, nothing is stored: the previous digest stays
+        # up and the next refresh retries.
+        try:
+            faqs = self._generate(history)
+            with self._lock:
+                self._fingerprint, self._faqs = fingerprint, faqs
+            if self.path:
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump({"fingerprint": fingerprint, "faqs": faqs}, f)
+                os.replace(tmp, self.path)
+        finally:
+            with self._lock:
+                self._pending = None
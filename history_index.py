@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import datetime, timedelta
+
+from history_log import TIMESTAMP_FORMAT, HistoryLog
+from triage_cache import normalize_text
+
+def _stamp(value: datetime | str) -> str:
+    return value.strftime(TIMESTAMP_FORMAT) if isinstance(value, datetime) else value
+
+def _hour(ts: str) -> str:
+    return ts[:13]
+
+def _next_hour(ts: str) -> str:
+    # First hour boundary at or after ts, as an "YYYY-MM-DD HH" key.
+    start = datetime.strptime(ts[:13], "%Y-%m-%d %H")
+    if ts[13:] not in ("", ":00:00"):
+        start += timedelta(hours=1)
+    return start.strftime("%Y-%m-%d %H")
+
+class HistoryIndex:
+    # A timestamp index plus per-hour rollups over a HistoryLog, kept up to
+    # date by reading only the bytes appended since the last refresh. A
+    # compaction or clear (new inode, shorter file) triggers one full rebuild.
+    # Window counts add up whole-hour rollups and only touch individual
+    # entries in the two partial hours at the edges.
+    def __init__(self, log: HistoryLog):
+        self.log = log
+        self._lock = threading.RLock()
+        self._reset(None)
+
+    def _reset(self, inode: int | None):
+        self._inode = inode
+        self._offset = 0
+        self._ts: list[str] = []
+        self._offsets: list[int] = []
+        self._depts: list[str] = []
+        self._issues: list[str] = []
+        self._hours: list[str] = []
+        self._dept_hourly: dict[str, Counter] = {}
+        self._issue_hourly: dict[str, Counter] = {}
+        self._examples: dict[str, dict] = {}
+
+    def refresh(self):
+        with self._lock:
+            try:
+                f = open(self.log.path, "rb")
+            except FileNotFoundError:
+                self._reset(None)
+                return
+            with f:
+                st = os.fstat(f.fileno())
+                if st.st_ino != self._inode or st.st_size < self._offset:
+                    self._reset(st.st_ino)
+                if st.st_size == self._offset:
+                    return
+                f.seek(self._offset)
+                data = f.read(st.st_size - self._offset)
+            # A writer may be mid-line; leave the partial line for next time.
+            end = data.rfind(b"\n") + 1
+            pos = self._offset
+            for line in data[:end].splitlines(keepends=True):
+                self._add(line, pos)
+                pos += len(line)
+            self._offset += end
+
+    def _add(self, line: bytes, offset: int):
+        try:
+            entry = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return
+        ts = entry.get("timestamp")
+        if not isinstance(ts, str) or len(ts) < 13:
+            return
+        dept = entry.get("department") or "Unknown"
+        issue = normalize_text(entry.get("input", ""))[:200]
+        if self._ts and ts < self._ts[-1]:
+            # Concurrent writers can land slightly out of order.
+            i = bisect_right(self._ts, ts)
+        else:
+            i = len(self._ts)
+        self._ts.insert(i, ts)
+        self._offsets.insert(i, offset)
+        self._depts.insert(i, dept)
+        self._issues.insert(i, issue)
+        hour = _hour(ts)
+        if hour not in self._dept_hourly:
+            insort(self._hours, hour)
+            self._dept_hourly[hour] = Counter()
+            self._issue_hourly[hour] = Counter()
+        self._dept_hourly[hour][dept] += 1
+        self._issue_hourly[hour][issue] += 1
+        self._examples[issue] = {"input": entry.get("input", ""), "department": dept}
+
+    def _range(self, since: str | None, until: str | None) -> tuple[int, int]:
+        lo = bisect_left(self._ts, since) if since else 0
+        hi = bisect_right(self._ts, until) if until else len(self._ts)
+        return lo, max(lo, hi)
+
+    def _tally(self, since: str, until: str, per_entry: list[str], hourly: dict[str, Counter]) -> Counter:
+        counts = Counter()
+        first_full, last_partial = _next_hour(since), _hour(until)
+        if first_full >= last_partial:
+            lo, hi = self._range(since, until)
+            counts.update(per_entry[lo:hi])
+            return counts
+        # [since, first_full) and [last_partial, until] entry by entry...
+        lo, hi = bisect_left(self._ts, since), bisect_left(self._ts, first_full)
+        counts.update(per_entry[lo:hi])
+        lo, hi = bisect_left(self._ts, last_partial), bisect_right(self._ts, until)
+        counts.update(per_entry[lo:hi])
+        # ...and whole hours from the rollups.
+        for hour in self._hours[bisect_left(self._hours, first_full):bisect_left(self._hours, last_partial)]:
+            counts.update(hourly[hour])
+        return counts
+
+    def _read(self, offsets: list[int]) -> list[dict] | None:
+        entries = []
+        with open(self.log.path, "rb") as f:
+            if os.fstat(f.fileno()).st_ino != self._inode:
+                return None
+            for offset in offsets:
+                f.seek(offset)
+                entries.append(json.loads(f.readline()))
+        return entries
+
+    def _read_range(self, bounds) -> list[dict]:
+        # Offsets are only valid for the inode they were read from; if the
+        # log was swapped underneath us, rebuild and read again.
+        for _ in range(2):
+            with self._lock:
+                self.refresh()
+                lo, hi = bounds()
+                try:
+                    entries = self._read(self._offsets[lo:hi])
+                except FileNotFoundError:
+                    return []
+            if entries is not None:
+                return entries
+        return []
+
+    def between(self, since: datetime | str | None = None, until: datetime | str | None = None) -> list[dict]:
+        since = _stamp(since) if since is not None else None
+        until = _stamp(until) if until is not None else None
+        return self._read_range(lambda: self._range(since, until))
+
+    def latest(self, n: int) -> list[dict]:
+        if n <= 0:
+            return []
+        return self._read_range(lambda: (max(0, len(self._ts) - n), len(self._ts)))
+
+    def count(self, since: datetime | str | None = None, until: datetime | str | None = None) -> int:
+        with self._lock:
+            self.refresh()
+            lo, hi = self._range(_stamp(since) if since else None, _stamp(until) if until else None)
+            return hi - lo
+
+    def fingerprint(self, since: datetime | str | None = None, until: datetime | str | None = None) -> str:
+        # Identifies the window's contents without reading them: the count
+        # plus the entries at both edges change whenever one enters or leaves.
+        with self._lock:
+            self.refresh()
+            lo, hi = self._range(_stamp(since) if since else None, _stamp(until) if until else None)
+            if lo == hi:
+                return f"{self._inode}:0"
+            return (f"{self._inode}:{hi - lo}:{self._ts[lo]}@{self._offsets[lo]}:"
+                    f"{self._ts[hi - 1]}@{self._offsets[hi - 1]}")
+
+    def counts_by_department(self, since: datetime | str, until: datetime | str) -> dict[str, int]:
+        with self._lock:
+            self.refresh()
+            return dict(self._tally(_stamp(since), _stamp(until), self._depts, self._dept_hourly))
+
+    def top_issues(self, since: datetime | str, until: datetime | str, n: int = 5) -> list[dict]:
+        with self._lock:
+            self.refresh()
+            counts = self._tally(_stamp(since), _stamp(until), self._issues, self._issue_hourly)
+            return [
+                {"issue": issue, "count": count, **self._examples.get(issue, {})}
+                for issue, count in counts.most_common(n)
+            ]
+
+    def last(self, hours: float, now: datetime | None = None) -> tuple[str, str]:
+        now = now or datetime.now()
+        return _stamp(now - timedelta(hours=hours)), _stamp(now)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize the triage history.")
+    parser.add_argument("--history", default="triage_history.jsonl")
+    parser.add_argument("--hours", type=float, default=24, help="window for per-department counts")
+    parser.add_argument("--top", type=int, default=10, help="recurring issues to list over the last week")
+    args = parser.parse_args(argv)
+
+    index = HistoryIndex(HistoryLog(args.history, legacy_path=None, compact_interval=float("inf")))
+    since, until = index.last(args.hours)
+    week_since, _ = index.last(24 * 7)
+    print(json.dumps({
+        "window": {"since": since, "until": until},
+        "tickets": index.count(since, until),
+        "by_department": index.counts_by_department(since, until),
+        "top_issues_7d": index.top_issues(week_since, until, args.top),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
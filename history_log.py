@@ -0,0 +1,128 @@
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class HistoryLog:
+    def __init__(self, path: str = "triage_history.jsonl", legacy_path: str | None = "triage_history.json",
+                 retention_days: float | None = 90, max_entries: int | None = 100_000,
+                 compact_interval: float = 3600):
+        self.path = path
+        self.retention_days = retention_days
+        self.max_entries = max_entries
+        self.compact_interval = compact_interval
+        self._last_compact = time.monotonic()
+        self._tail_cache: tuple[tuple, list[dict]] | None = None
+        if legacy_path and os.path.exists(legacy_path) and not os.path.exists(path):
+            self._migrate(legacy_path)
+
+    # Appends and compaction lock a sidecar file rather than the log itself,
+    # because compaction swaps the log's inode out from under waiting writers.
+    @contextmanager
+    def _locked(self, mode=fcntl.LOCK_EX):
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _migrate(self, legacy_path: str):
+        # The legacy file is renamed once copied so a later clear() can't
+        # bring its entries back.
+        with self._locked():
+            if os.path.exists(self.path) or not os.path.exists(legacy_path):
+                return
+            with open(legacy_path, "r") as f:
+                entries = json.load(f)
+            self._rewrite(entries)
+            os.replace(legacy_path, legacy_path + ".migrated")
+
+    def append(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._locked():
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        if time.monotonic() - self._last_compact >= self.compact_interval:
+            self.compact()
+
+    def __iter__(self):
+        return self.iter_entries()
+
+    def iter_entries(self, since: str | None = None, until: str | None = None):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                ts = entry.get("timestamp", "")
+                if since and ts < since:
+                    continue
+                if until and ts > until:
+                    continue
+                yield entry
+
+    def tail(self, n: int, block_size: int = 64 * 1024) -> list[dict]:
+        if n <= 0 or not os.path.exists(self.path):
+            return []
+        # The UI asks for the same tail on every rerun; skip the read when
+        # the file has not changed since.
+        st = os.stat(self.path)
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size, n)
+        cached = self._tail_cache
+        if cached is not None and cached[0] == stamp:
+            return list(cached[1])
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b""
+            while pos > 0 and buf.count(b"\n") <= n:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+        entries = []
+        for line in reversed(buf.splitlines()):
+            if len(entries) == n:
+                break
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        entries.reverse()
+        self._tail_cache = (stamp, entries)
+        return list(entries)
+
+    def compact(self):
+        self._last_compact = time.monotonic()
+        cutoff = None
+        if self.retention_days is not None:
+            cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime(TIMESTAMP_FORMAT)
+        with self._locked():
+            entries = list(self.iter_entries(since=cutoff))
+            if self.max_entries is not None:
+                entries = entries[-self.max_entries:]
+            self._rewrite(entries)
+
+    def _rewrite(self, entries: list[dict]):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        with self._locked():
+            if os.path.exists(self.path):
+                os.remove(self.path)
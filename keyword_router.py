@@ -0,0 +1,74 @@
+import json
+import re
+from typing import NamedTuple
+
+class KeywordRule(NamedTuple):
+    phrase: str
+    department: str
+    priority: int = 0
+    word_boundary: bool = True
+    fuzzy: bool = True
+
+# Plain substring rules, as the original any() scans matched them.
+DEFAULT_RULES = [
+    KeywordRule(phrase, department, priority, word_boundary=False, fuzzy=False)
+    for phrase, department, priority in [
+        ("mouse speed", "WCINYP IT", 30),
+        ("gaming mouse", "WCINYP IT", 30),
+        ("change mouse sensitivity", "WCINYP IT", 30),
+        ("g hub", "Radiqal", 20),
+        ("mouse macro", "Radiqal", 20),
+        ("macros on my mouse", "Radiqal", 20),
+        ("screen scaling", "WCINYP IT", 10),
+        ("display scaling", "WCINYP IT", 10),
+        ("adjust display settings", "WCINYP IT", 10),
+        ("first time logging in", "WCINYP IT", 10),
+    ]
+]
+
+# Tokens of a fuzzy phrase may be joined by any run of whitespace, hyphens,
+# underscores or slashes ("g hub", "g-hub", "ghub").
+_FUZZY_SEP = r"[\s\-_/]*"
+
+def _phrase_pattern(rule: KeywordRule) -> str:
+    if rule.fuzzy:
+        body = _FUZZY_SEP.join(re.escape(t) for t in rule.phrase.lower().split())
+    else:
+        body = re.escape(rule.phrase.lower())
+    if rule.word_boundary:
+        body = rf"(?<!\w){body}(?!\w)"
+    return body
+
+class KeywordRouter:
+    def __init__(self, rules: list[KeywordRule] | None = None):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        # Alternatives are tried in order at each position, so higher priority
+        # and longer phrases go first. The whole alternation sits in a
+        # lookahead so every position is tried and overlapping phrases can't
+        # hide one another.
+        order = sorted(range(len(self.rules)), key=lambda i: (-self.rules[i].priority, -len(self.rules[i].phrase)))
+        self._pattern = None
+        if order:
+            self._pattern = re.compile(
+                "(?=" + "|".join(f"(?P<r{i}>{_phrase_pattern(self.rules[i])})" for i in order) + ")",
+                re.IGNORECASE,
+            )
+
+    def match(self, text: str) -> KeywordRule | None:
+        if self._pattern is None:
+            return None
+        best = None
+        for m in self._pattern.finditer(text):
+            rule = self.rules[int(m.lastgroup[1:])]
+            if best is None or rule.priority > best.priority:
+                best = rule
+        return best
+
+    def route(self, text: str) -> str | None:
+        rule = self.match(text)
+        return rule.department if rule else None
+
+def load_rules(path: str) -> list[KeywordRule]:
+    with open(path, "r") as f:
+        raw = json.load(f)
+    return [KeywordRule(**r) for r in raw]
@@ -0,0 +1,234 @@
+import asyncio
+import contextlib
+import contextvars
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+from metrics import metrics
+from registry import registry
+
+T = TypeVar("T")
+
+_inside_call: contextvars.ContextVar[bool] = contextvars.ContextVar("radbit_inside_llm_call", default=False)
+
+def openai_module():
+    # openai is a heavy import; defer it to the first LLM call.
+    return registry.get("openai", lambda: __import__("openai"))
+
+def retryable_errors() -> tuple[type[BaseException], ...]:
+    openai = openai_module()
+    return (
+        asyncio.TimeoutError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+class UpstreamError(RuntimeError):
+    pass
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            # After the reset timeout, let exactly one probe call through.
+            if time.monotonic() - self._opened_at >= self.reset_timeout and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release_probe(self):
+        # The call holding the half-open probe ended without an answer
+        # (cancelled); let the next call probe instead.
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    metrics.inc("radbit_llm_breaker_open_total")
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 20) -> float | None:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class _ThreadSafeLimiter:
+    # Sessions run on separate threads with separate event loops, so the
+    # concurrency budget has to be shared through a threading primitive.
+    def __init__(self, limit: int):
+        self._sem = threading.BoundedSemaphore(limit)
+
+    async def __aenter__(self):
+        delay = 0.001
+        while not self._sem.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    async def __aexit__(self, *exc):
+        self._sem.release()
+        return False
+
+class LLMGateway:
+    def __init__(self, timeout: float = 30, retries: int = 2, backoff_base: float = 0.25,
+                 backoff_cap: float = 4, max_concurrency: int = 32, hedge: bool = False,
+                 hedge_after: float | None = None, breaker: CircuitBreaker | None = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self._limiter = _ThreadSafeLimiter(max_concurrency)
+        self._latency: dict[str, LatencyTracker] = {}
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, openai.AsyncOpenAI]" = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+
+    def client(self) -> "openai.AsyncOpenAI":
+        # One pooled keep-alive client per event loop: connection pools are
+        # bound to the loop that opened them. Retries happen in the gateway.
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(loop)
+                if client is None:
+                    client = self._clients[loop] = openai_module().AsyncOpenAI(max_retries=0, timeout=self.timeout)
+        return client
+
+    def _hedge_delay(self, name: str) -> float | None:
+        if not self.hedge:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        return self._latency.setdefault(name, LatencyTracker()).percentile(0.95)
+
+    async def _attempt(self, name: str, fn: Callable[[], Awaitable[T]]) -> T:
+        delay = self._hedge_delay(name)
+        tasks = [asyncio.ensure_future(fn())]
+        try:
+            if delay is None:
+                return await tasks[0]
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                metrics.inc("radbit_llm_hedges_total", call=name)
+                tasks.append(asyncio.ensure_future(fn()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Every copy failed: surface the original request's error.
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def acall(self, name: str, fn: Callable[[], Awaitable[T]], deadline: float | None = None) -> T:
+        if not self.breaker.allow():
+            metrics.inc("radbit_llm_short_circuits_total", call=name)
+            raise CircuitOpenError(f"LLM upstream unavailable; circuit open for {name}")
+        budget = deadline or self.timeout * (self.retries + 1)
+        give_up_at = time.monotonic() + budget
+        attempt = 0
+        while True:
+            remaining = give_up_at - time.monotonic()
+            start = time.monotonic()
+            try:
+                # A call made from inside another gateway call (the guardrail
+                # inside the triage run) shares its parent's concurrency slot.
+                async with self._limiter if not _inside_call.get() else contextlib.nullcontext():
+                    token = _inside_call.set(True)
+                    try:
+                        result = await asyncio.wait_for(self._attempt(name, fn), min(self.timeout, remaining))
+                    finally:
+                        _inside_call.reset(token)
+            except retryable_errors() as e:
+                self.breaker.record_failure()
+                metrics.inc("radbit_llm_failures_total", call=name, error=type(e).__name__)
+                attempt += 1
+                backoff = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                if attempt > self.retries or time.monotonic() + backoff >= give_up_at or self.breaker.state != "closed":
+                    raise UpstreamError(f"{name} failed after {attempt} attempt(s): {e!r}") from e
+                metrics.inc("radbit_llm_retries_total", call=name)
+                await asyncio.sleep(backoff)
+                continue
+            except Exception:
+                # The upstream answered (bad request, guardrail tripwire, ...),
+                # so it counts as healthy for the breaker.
+                self.breaker.record_success()
+                raise
+            except BaseException:
+                # Cancelled (the guardrail tripped, the route failed): no
+                # verdict on the upstream, but don't keep the probe slot.
+                self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            self._latency.setdefault(name, LatencyTracker()).add(time.monotonic() - start)
+            return result
+
+def _from_env() -> LLMGateway:
+    return LLMGateway(
+        timeout=float(os.environ.get("RADBIT_LLM_TIMEOUT", 30)),
+        retries=int(os.environ.get("RADBIT_LLM_RETRIES", 2)),
+        max_concurrency=int(os.environ.get("RADBIT_LLM_MAX_CONCURRENCY", 32)),
+        hedge=os.environ.get("RADBIT_LLM_HEDGE", "").lower() in ("1", "true", "yes"),
+        hedge_after=float(os.environ["RADBIT_LLM_HEDGE_AFTER"]) if os.environ.get("RADBIT_LLM_HEDGE_AFTER") else None,
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.environ.get("RADBIT_BREAKER_FAILURES", 5)),
+            reset_timeout=float(os.environ.get("RADBIT_BREAKER_RESET", 30)),
+        ),
+    )
+
+gateway = _from_env()
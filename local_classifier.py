@@ -0,0 +1,170 @@
+import argparse
+import json
+import re
+import zlib
+
+import numpy as np
+
+from history_log import HistoryLog
+
+N_FEATURES = 1 << 16
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> list[str]:
+    words = _TOKEN_RE.findall(text.lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+def hashed_counts(text: str) -> tuple[np.ndarray, np.ndarray]:
+    buckets = np.fromiter(
+        (zlib.crc32(t.encode("utf-8")) % N_FEATURES for t in tokenize(text)), dtype=np.int64
+    )
+    idx, counts = np.unique(buckets, return_counts=True)
+    return idx, counts.astype(np.float32)
+
+class LocalClassifier:
+    def __init__(self, labels: list[str], idf: np.ndarray, class_log_prior: np.ndarray,
+                 feature_log_prob: np.ndarray):
+        self.labels = labels
+        self.idf = idf
+        self.class_log_prior = class_log_prior
+        self.feature_log_prob = feature_log_prob
+
+    def _features(self, text: str) -> tuple[np.ndarray, np.ndarray, float]:
+        idx, counts = hashed_counts(text)
+        if not len(idx):
+            return idx, counts, 0.0
+        known = self.idf[idx] > 0
+        coverage = float(counts[known].sum() / counts.sum())
+        vals = (1.0 + np.log(counts)) * self.idf[idx]
+        norm = np.linalg.norm(vals)
+        if norm:
+            vals = vals / norm
+        return idx, vals, coverage
+
+    def predict(self, text: str) -> tuple[str, float, float]:
+        idx, vals, coverage = self._features(text)
+        scores = self.class_log_prior + self.feature_log_prob[:, idx] @ vals
+        probs = np.exp(scores - scores.max())
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.labels[best], float(probs[best]), coverage
+
+    def route(self, text: str, threshold: float = 0.9, min_coverage: float = 0.5) -> str | None:
+        label, confidence, coverage = self.predict(text)
+        # Text made mostly of tokens never seen in training (including off-topic
+        # requests the guardrail would reject) always goes to the LLM.
+        if confidence >= threshold and coverage >= min_coverage:
+            return label
+        return None
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            labels=np.array(self.labels),
+            idf=self.idf,
+            class_log_prior=self.class_log_prior,
+            feature_log_prob=self.feature_log_prob,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LocalClassifier":
+        with np.load(path) as data:
+            return cls(
+                labels=[str(l) for l in data["labels"]],
+                idf=data["idf"],
+                class_log_prior=data["class_log_prior"],
+                feature_log_prob=data["feature_log_prob"],
+            )
+
+def train(texts: list[str], labels: list[str], alpha: float = 0.1) -> LocalClassifier:
+    classes = sorted(set(labels))
+    rows = [hashed_counts(t) for t in texts]
+
+    df = np.zeros(N_FEATURES, dtype=np.float32)
+    for idx, _ in rows:
+        df[idx] += 1
+    idf = np.where(df > 0, np.log((1 + len(texts)) / (1 + df)) + 1, 0).astype(np.float32)
+
+    class_index = {c: i for i, c in enumerate(classes)}
+    weights = np.zeros((len(classes), N_FEATURES), dtype=np.float32)
+    class_counts = np.zeros(len(classes), dtype=np.float32)
+    for (idx, counts), label in zip(rows, labels):
+        vals = (1.0 + np.log(counts)) * idf[idx]
+        norm = np.linalg.norm(vals)
+        if norm:
+            vals = vals / norm
+        c = class_index[label]
+        weights[c, idx] += vals
+        class_counts[c] += 1
+
+    # Multinomial naive Bayes over TF-IDF weights, smoothed only over buckets
+    # that occur in training so unused hash space does not dilute the estimate.
+    seen = df > 0
+    smoothed = weights + alpha * seen
+    totals = smoothed.sum(axis=1, keepdims=True)
+    feature_log_prob = np.where(seen, np.log(np.maximum(smoothed, 1e-12) / totals), 0).astype(np.float32)
+    class_log_prior = np.log(class_counts / class_counts.sum()).astype(np.float32)
+    return LocalClassifier(classes, idf, class_log_prior, feature_log_prob)
+
+# Routing tiers whose department was decided by the LLM. Keyword, local-model
+# and degraded-fallback routings would teach the model its own guesses.
+LLM_TIERS = {"llm", "cache", "coalesced"}
+
+def load_history_pairs(path: str, include_untagged: bool = False) -> tuple[list[str], list[str]]:
+    texts, labels = [], []
+    for entry in HistoryLog(path):
+        tier = entry.get("routing_tier")
+        if tier not in LLM_TIERS and not (tier is None and include_untagged):
+            continue
+        if entry.get("input") and entry.get("department"):
+            texts.append(entry["input"])
+            labels.append(entry["department"])
+    return texts, labels
+
+def evaluate(model: LocalClassifier, texts: list[str], labels: list[str],
+             threshold: float = 0.9, min_coverage: float = 0.5) -> dict:
+    covered = agreed = 0
+    for text, label in zip(texts, labels):
+        pred = model.route(text, threshold, min_coverage)
+        if pred is not None:
+            covered += 1
+            agreed += pred == label
+    return {
+        "entries": len(texts),
+        "covered": covered,
+        "coverage": covered / len(texts) if texts else 0.0,
+        "agreement": agreed / covered if covered else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or evaluate the local triage classifier.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("train", "report"):
+        p = sub.add_parser(name)
+        p.add_argument("--history", default="triage_history.jsonl")
+        p.add_argument("--model", default="local_classifier.npz")
+        p.add_argument("--threshold", type=float, default=0.9)
+        p.add_argument("--min-coverage", type=float, default=0.5)
+        p.add_argument("--include-untagged", action="store_true",
+                       help="also use entries logged before routing_tier was recorded")
+    sub.choices["train"].add_argument("--holdout", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    texts, labels = load_history_pairs(args.history, args.include_untagged)
+    if args.command == "train":
+        order = np.random.default_rng(0).permutation(len(texts))
+        n_test = int(len(texts) * args.holdout)
+        test, fit = order[:n_test], order[n_test:]
+        if n_test:
+            held = train([texts[i] for i in fit], [labels[i] for i in fit])
+            report = evaluate(held, [texts[i] for i in test], [labels[i] for i in test],
+                              args.threshold, args.min_coverage)
+            print(json.dumps({"holdout": report}, indent=2))
+        train(texts, labels).save(args.model)
+        print(f"Trained on {len(texts)} entries -> {args.model}")
+    else:
+        model = LocalClassifier.load(args.model)
+        print(json.dumps(evaluate(model, texts, labels, args.threshold, args.min_coverage), indent=2))
+
+if __name__ == "__main__":
+    main()
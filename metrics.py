@@ -0,0 +1,190 @@
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_current_trace: contextvars.ContextVar[list | None] = contextvars.ContextVar("radbit_trace", default=None)
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key: tuple, extra: dict | None = None) -> str:
+    items = list(key) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+class _Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metrics:
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, _Histogram]] = {}
+        self._collectors: list[Callable[[], dict[str, float]]] = []
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram()
+            hist.observe(value)
+
+    @contextlib.contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe("radbit_stage_seconds", elapsed, stage=stage)
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.append((stage, elapsed))
+
+    def record_usage(self, stage: str, usage):
+        if usage is None:
+            return
+        self.inc("radbit_prompt_tokens_total", getattr(usage, "prompt_tokens", None)
+                 or getattr(usage, "input_tokens", 0) or 0, stage=stage)
+        self.inc("radbit_completion_tokens_total", getattr(usage, "completion_tokens", None)
+                 or getattr(usage, "output_tokens", 0) or 0, stage=stage)
+
+    def add_collector(self, collector: Callable[[], dict[str, float]]):
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(k), "value": v} for k, v in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {"labels": dict(k), "count": h.count, "sum": h.sum,
+                     "buckets": dict(zip([*map(str, h.buckets), "+Inf"], h.counts))}
+                    for k, h in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        gauges = {}
+        for collector in self._collectors:
+            gauges.update(collector())
+        return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f"# TYPE {name} counter")
+                lines += [f"{name}{_format_labels(k)} {v}" for k, v in series.items()]
+            for name, series in self._histograms.items():
+                lines.append(f"# TYPE {name} histogram")
+                for k, h in series.items():
+                    cumulative = 0
+                    for bound, count in zip([*h.buckets, "+Inf"], h.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(k, {'le': bound})} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(k)} {h.sum}")
+                    lines.append(f"{name}_count{_format_labels(k)} {h.count}")
+        for collector in self._collectors:
+            for name, value in collector().items():
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+class NoopMetrics(Metrics):
+    enabled = False
+
+    def inc(self, name: str, value: float = 1, **labels):
+        pass
+
+    def observe(self, name: str, value: float, **labels):
+        pass
+
+    def span(self, stage: str):
+        return contextlib.nullcontext()
+
+    def record_usage(self, stage: str, usage):
+        pass
+
+@contextlib.contextmanager
+def trace():
+    spans: list[tuple[str, float]] = []
+    token = _current_trace.set(spans)
+    try:
+        yield spans
+    finally:
+        _current_trace.reset(token)
+
+def serve_prometheus(registry: Metrics, port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_json_dump(registry: Metrics, path: str, interval: float = 60) -> threading.Event:
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(registry.snapshot(), f)
+            os.replace(tmp, path)
+
+    threading.Thread(target=loop, daemon=True, name="metrics-dump").start()
+    return stop
+
+def _from_env() -> Metrics:
+    if os.environ.get("RADBIT_METRICS", "").lower() not in ("1", "true", "yes"):
+        return NoopMetrics()
+    registry = Metrics()
+    if os.environ.get("RADBIT_METRICS_PORT"):
+        serve_prometheus(registry, int(os.environ["RADBIT_METRICS_PORT"]))
+    if os.environ.get("RADBIT_METRICS_JSON"):
+        start_json_dump(registry, os.environ["RADBIT_METRICS_JSON"],
+                        float(os.environ.get("RADBIT_METRICS_JSON_INTERVAL", 60)))
+    return registry
+
+metrics = _from_env()
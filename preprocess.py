@@ -0,0 +1,167 @@
+import functools
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from metrics import metrics
+
+# Line shapes that mark pasted logs, dialogs and stack traces rather than the
+# user's own description.
+LOG_LINE = re.compile(
+    r"^\s*(?:"
+    r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}|\d{1,2}/\d{1,2}/\d{2,4}\s+\d{1,2}:\d{2}|\[?\d{2}:\d{2}:\d{2}"
+    r"|\[?(?:TRACE|DEBUG|INFO|WARN(?:ING)?|ERROR|FATAL|SEVERE|CRITICAL)\b"
+    r"|at\s+[\w$.<>]+\(.*\)|File \".*\", line \d+|Traceback \(most recent call last\)"
+    r"|Caused by:|\.{3} \d+ more|[\w.]+(?:Exception|Error)\b"
+    r")",
+    re.IGNORECASE,
+)
+SALIENT_LINE = re.compile(
+    r"\b(?:error|exception|fail(?:ed|ure)?|fatal|denied|refused|timed? ?out|timeout|unable|cannot|"
+    r"can't|crash(?:ed)?|invalid|not found|unavailable|corrupt|code)\b",
+    re.IGNORECASE,
+)
+IDENTIFIER = re.compile(
+    r"\b(?:0x[0-9A-Fa-f]{4,}|[A-Z]{2,}[-_]\d{2,}|(?:HTTP|Error|Code)\s*:?\s*\d{3,}|"
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[\w.+-]+\.(?:exe|dll|dcm|log))\b"
+)
+_EXCEPTION_NAME = re.compile(r"Exception|Error|Traceback")
+_VARIABLE = re.compile(r"0x[0-9A-Fa-f]+|[0-9a-f]{8}-[0-9a-f-]{27}|\d+")
+_APPROX_TOKEN = re.compile(r"[A-Za-z]{1,6}|\d{1,3}|[^\sA-Za-z\d]")
+
+@functools.lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("o200k_base")
+
+def count_tokens(text: str) -> int:
+    # tiktoken when installed; otherwise a BPE-shaped estimate that errs a
+    # little high for prose and close for logs.
+    enc = _encoder()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return len(_APPROX_TOKEN.findall(text))
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    if count_tokens(text) <= budget:
+        return text
+    enc = _encoder()
+    if enc is not None:
+        return enc.decode(enc.encode(text, disallowed_special=())[:budget]).rstrip() + " …"
+    pieces = list(_APPROX_TOKEN.finditer(text))
+    return text[:pieces[budget].start()].rstrip() + " …" if budget < len(pieces) else text
+
+class Condensed(NamedTuple):
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def condensed(self) -> bool:
+        return self.tokens < self.original_tokens
+
+def _template(line: str) -> str:
+    return _VARIABLE.sub("#", line.strip())
+
+def _collapse_runs(lines: list[str], logs_only: bool = False) -> list[str]:
+    # Consecutive lines that differ only in numbers/ids become one line. With
+    # logs_only, the user's own lines are never merged.
+    out, i = [], 0
+    while i < len(lines):
+        j = i + 1
+        if not logs_only or LOG_LINE.match(lines[i]):
+            while j < len(lines) and _template(lines[j]) == _template(lines[i]):
+                j += 1
+        out.append(lines[i] if j - i == 1 else f"{lines[i]}  [repeated {j - i}x]")
+        i = j
+    return out
+
+def condense(text: str, budget: int) -> Condensed:
+    original = count_tokens(text)
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    if original <= budget:
+        # Within budget only repeated log lines are collapsed; nothing is
+        # dropped and the user's own words are left as written.
+        collapsed = _collapse_runs(lines, logs_only=True)
+        if len(collapsed) == len(lines):
+            return Condensed(text, original, original)
+        result = "\n".join(collapsed)
+        return Condensed(result, original, count_tokens(result))
+
+    log_lines = [line for line in lines if LOG_LINE.match(line)]
+    prose = _collapse_runs([line for line in lines if line.strip() and not LOG_LINE.match(line)])
+    # From the log part keep each distinct error-looking line or exception
+    # header once, in order; drop the rest.
+    seen, salient = set(), []
+    for line in _collapse_runs(log_lines):
+        key = _template(line)
+        if key in seen:
+            continue
+        if SALIENT_LINE.search(line) or _EXCEPTION_NAME.search(line):
+            seen.add(key)
+            salient.append(line.strip())
+    identifiers = list(dict.fromkeys(m.group(0) for m in IDENTIFIER.finditer(text)))
+
+    parts = []
+    if prose:
+        parts.append("\n".join(prose))
+    if salient:
+        parts.append("Key log lines:\n" + "\n".join(salient))
+    if identifiers:
+        parts.append("Identifiers: " + ", ".join(identifiers[:20]))
+    if log_lines:
+        parts.append(f"[{len(log_lines)} log lines condensed]")
+
+    # Fit the budget: the user's own words first, then log lines in order.
+    kept, used = [], 0
+    for part in parts:
+        cost = count_tokens(part) + 1
+        if used + cost <= budget:
+            kept.append(part)
+            used += cost
+            continue
+        remaining = budget - used
+        if remaining > 8:
+            kept.append(truncate_to_tokens(part, remaining - 1))
+        break
+    result = "\n\n".join(kept)
+    return Condensed(result, original, count_tokens(result))
+
+INPUT_TOKEN_BUDGET = int(os.environ.get("RADBIT_INPUT_TOKEN_BUDGET", 512))
+
+_CACHE_SIZE = 1024
+_cache: OrderedDict[tuple[str, int], str] = OrderedDict()
+_cache_lock = threading.Lock()
+
+def condensed_input(text: str, budget: int | None = None) -> str:
+    # One pass per distinct ticket: the guardrail, triage, email and FAQ
+    # prompts all receive this same condensed text. Keyed by digest so the
+    # cache never holds on to whole pasted logs.
+    budget = INPUT_TOKEN_BUDGET if budget is None else budget
+    key = (hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest(), budget)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+    with metrics.span("preprocess"):
+        result = condense(text, budget)
+    metrics.inc("radbit_input_tokens_total", result.original_tokens, stage="raw")
+    metrics.inc("radbit_input_tokens_total", result.tokens, stage="condensed")
+    if result.condensed:
+        metrics.inc("radbit_inputs_condensed_total")
+    with _cache_lock:
+        _cache[key] = result.text
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result.text
+
+def split_budget(total: int, parts: int, floor: int = 16) -> int:
+    return max(floor, math.floor(total / max(1, parts)))
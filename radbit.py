@@ -1,117 +1,195 @@
+import time
+
+_import_started = time.perf_counter()
+
 import asyncio
+import contextlib
+import functools
+import hashlib
+import importlib
 import json
+import os
+import threading
+from collections import Counter
 from datetime import datetime
-from pydantic import BaseModel
-from openai import OpenAI
-from agents import (
-    Agent,
-    Runner,
-    input_guardrail,
-    GuardrailFunctionOutput,
-    RunContextWrapper,
-    TResponseInputItem,
-)
-import holidays
-
-_client = OpenAI()
-
-class SupportResponse(BaseModel):
-    department: str
-    phone: str
-    email: str
-    other: str
-    note: str
-    hours: str
-    email_draft: str
-    support_available: bool = True
-    fallback_department: str | None = None
-
-class DepartmentLabel(BaseModel):
-    department: str
-
-class OutOfScopeCheck(BaseModel):
-    is_off_topic: bool
-    explanation: str
-
-guardrail_filter_agent = Agent(
-    name="Out-of-Scope Filter",
-    instructions="""
-Determine if the user's message is off-topic (philosophical, existential, etc.).
-Only allow clear radiology/IT support requests through.
-""",
-    output_type=OutOfScopeCheck,
-    model="gpt-4o",
-)
+from typing import AsyncIterator, Iterator
+from admission import AdmissionRejected, Priority, admission, classify_priority
+from availability import AvailabilityEngine, holiday_dates
+from backend_store import open_store
+from cascade import CascadeConfig, asmall_model_label, record_tier
+from keyword_router import KeywordRouter, KeywordRule, load_rules
+from llm_gateway import UpstreamError, gateway, openai_module
+from metrics import metrics
+from preprocess import condensed_input, split_budget
+from registry import registry
+from scope_filter import in_scope_match
+from singleflight import SingleFlight
+from triage_cache import TriageCache, agent_fingerprint, normalize_text
+
+UPSTREAM_ERRORS = (UpstreamError,)
+# Errors after which a call degrades to its local fallback rather than failing.
+DEGRADE_ERRORS = (AdmissionRejected, *UPSTREAM_ERRORS)
+
+# pydantic, openai-agents and openai load on first use rather than at import,
+# so keyword- and local-model-routed requests never pay for them.
+def _schemas():
+    return registry.get("schemas", lambda: importlib.import_module("schemas"))
+
+def _agents():
+    return registry.get("triage_agents", lambda: importlib.import_module("triage_agents"))
+
+_LAZY_SCHEMAS = {"SupportResponse", "DepartmentLabel", "OutOfScopeCheck"}
+_LAZY_AGENTS = {
+    "guardrail_filter_agent", "radiology_scope_guardrail", "hospital_rr_agent", "virtual_helpdesk_agent",
+    "wcinyp_agent", "radiqal_agent", "triage_agent",
+}
 
-@input_guardrail
-async def radiology_scope_guardrail(
-    ctx: RunContextWrapper[None],
-    agent: Agent,
-    input: str | list[TResponseInputItem],
-) -> GuardrailFunctionOutput:
-    out = await Runner.run(guardrail_filter_agent, input, context=ctx.context)
-    return GuardrailFunctionOutput(
+def __getattr__(name: str):
+    if name in _LAZY_SCHEMAS:
+        return getattr(_schemas(), name)
+    if name in _LAZY_AGENTS:
+        return getattr(_agents(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _run_usage(result):
+    wrapper = getattr(result, "context_wrapper", None)
+    return getattr(wrapper, "usage", None)
+
+SCOPE_LABELS = ["in scope: a radiology or IT support request", "off-topic"]
+
+async def ascope_check(input: str | list, context=None):
+    ta = _agents()
+    term = in_scope_match(input) if isinstance(input, str) else None
+    if term:
+        metrics.inc("radbit_guardrail_total", result="prefilter")
+        return ta.GuardrailFunctionOutput(
+            output_info=ta.OutOfScopeCheck(is_off_topic=False, explanation=f"Matched in-scope term {term!r}"),
+            tripwire_triggered=False,
+        )
+    if _cascade.enabled and isinstance(input, str):
+        try:
+            label, confidence, _ = await asmall_model_label(
+                "guardrail", ta.guardrail_filter_agent.instructions, SCOPE_LABELS, input, _cascade
+            )
+        except Exception:
+            record_tier("guardrail", "large", "error")
+        else:
+            if confidence >= _cascade.threshold:
+                record_tier("guardrail", "small", "confident")
+                off_topic = label == SCOPE_LABELS[1]
+                metrics.inc("radbit_guardrail_total", result="tripped" if off_topic else "passed")
+                return ta.GuardrailFunctionOutput(
+                    output_info=ta.OutOfScopeCheck(
+                        is_off_topic=off_topic,
+                        explanation=f"{_cascade.small_model} answered {label!r} ({confidence:.2f})",
+                    ),
+                    tripwire_triggered=off_topic,
+                )
+            record_tier("guardrail", "large", "low_confidence")
+    with metrics.span("guardrail"):
+        out = await gateway.acall("guardrail", lambda: ta.Runner.run(ta.guardrail_filter_agent, input, context=context))
+    metrics.record_usage("guardrail", _run_usage(out))
+    metrics.inc("radbit_guardrail_total", result="tripped" if out.final_output.is_off_topic else "passed")
+    return ta.GuardrailFunctionOutput(
         output_info=out.final_output,
         tripwire_triggered=out.final_output.is_off_topic,
     )
 
-def keyword_based_department_routing(user_input: str) -> str | None:
-    text = user_input.lower()
-    if any(kw in text for kw in ["mouse speed", "gaming mouse", "change mouse sensitivity"]):
-        return "WCINYP IT"
-    if any(kw in text for kw in ["g hub", "mouse macro", "macros on my mouse"]):
-        return "Radiqal"
-    if any(kw in text for kw in ["screen scaling", "display scaling", "adjust display settings", "first time logging in"]):
-        return "WCINYP IT"
-    return None
-
-hospital_rr_agent = Agent(
-    name="Hospital Reading Rooms Agent",
-    instructions="Support for issues during image interpretation in PACS systems like viewer freezes, CT/MRI image crashes, or diagnostic disruptions.",
-    model="gpt-4o",
-)
-virtual_helpdesk_agent = Agent(
-    name="Virtual HelpDesk Agent",
-    instructions="Only handle in-hospital workstation access problems (e.g., badge logins, password resets, SSO/certificates). Do NOT handle workstation software, macros, display settings, PACS viewers, or hardware config.",
-    model="gpt-4o",
-)
-wcinyp_agent = Agent(
-    name="WCINYP IT Agent",
-    instructions="Handle home/remote setup issues (e.g., VPN, EPIC, Outlook, keyboard/mouse setup, display scaling, VuePACS config, hardware problems, software installs, peripheral calibration). Also covers first-time login setup.",
-    model="gpt-4o",
-)
-radiqal_agent = Agent(
-    name="Radiqal Agent",
-    instructions="Handle QA workflow breakdowns, missing templates, and system-specific issues in Radiqal, Fluency, or PACS integrations involving macros or viewer behaviors.",
-    model="gpt-4o",
+_keyword_router = KeywordRouter(
+    load_rules(os.environ["RADBIT_KEYWORD_RULES"]) if os.environ.get("RADBIT_KEYWORD_RULES") else None
 )
 
-triage_agent = Agent(
-    name="Support Triage Agent",
-    instructions="""
-Given a user support issue, choose exactly one of the following departments and return only JSON: 
-{"department": "Hospital Reading Rooms"}, 
-{"department": "Virtual HelpDesk"}, 
-{"department": "WCINYP IT"}, 
-{"department": "Radiqal"}
+def keyword_rule_match(user_input: str) -> KeywordRule | None:
+    return _keyword_router.match(user_input)
 
-Use this rule set:
+def keyword_based_department_routing(user_input: str) -> str | None:
+    return _keyword_router.route(user_input)
 
-- WCINYP IT: Issues with display scaling, gaming mouse speed, duplicate dictation, VuePACS lossy images, Stat DX not launching, hardware setup, server address corrections (Olea/TeraRecon/Dynacad), monitor config, workstation behavior, or onboarding/first-login screen layout problems.
+LOCAL_MODEL_PATH = os.environ.get("RADBIT_LOCAL_MODEL", "local_classifier.npz")
+LOCAL_MODEL_THRESHOLD = float(os.environ.get("RADBIT_LOCAL_THRESHOLD", 0.9))
 
-- Radiqal: Issues involving macros in G HUB, missing or broken Fluency templates, inability to view outside studies in VuePACS, and all QA workflow/platform discrepancies or tip sheet-based platforms.
+def _load_local_classifier():
+    # numpy comes in with the classifier, so only when a trained model exists.
+    from local_classifier import LocalClassifier
+    return LocalClassifier.load(LOCAL_MODEL_PATH)
 
-- Hospital Reading Rooms: Crashes/freezes of the PACS viewer during interpretation, sudden PACS lockups, or reading disruptions that affect diagnostic throughput.
+_local_classifier = _load_local_classifier() if os.path.exists(LOCAL_MODEL_PATH) else None
 
-- Virtual HelpDesk: In-hospital desktop login/certificate/access problems (badge, Duo, SSO), ONLY if no mention of hardware config or software calibration.
+def local_department_routing(user_input: str) -> str | None:
+    if _local_classifier is None:
+        return None
+    return _local_classifier.route(user_input, threshold=LOCAL_MODEL_THRESHOLD)
 
-Return JSON exactly like {"department": "Radiqal"}.
-""",
-    output_type=DepartmentLabel,
-    handoffs=[hospital_rr_agent, virtual_helpdesk_agent, wcinyp_agent, radiqal_agent],
-    model="gpt-4o",
-    input_guardrails=[radiology_scope_guardrail],
-)
+PRIORITY_HINT_THRESHOLD = float(os.environ.get("RADBIT_PRIORITY_HINT_THRESHOLD", 0.5))
+
+@functools.lru_cache(maxsize=1024)
+def ticket_priority(user_input: str) -> Priority:
+    # Cheap enough to run before any LLM call: the keyword router or a
+    # moderately confident local-model guess picks the department class,
+    # urgency words bump it up a level.
+    dept = keyword_based_department_routing(user_input)
+    if dept is None and _local_classifier is not None:
+        label, confidence, _ = _local_classifier.predict(user_input)
+        if confidence >= PRIORITY_HINT_THRESHOLD:
+            dept = label
+    return classify_priority(user_input, dept)
+
+FALLBACK_DEPARTMENT = os.environ.get("RADBIT_FALLBACK_DEPARTMENT", "WCINYP IT")
+
+def degraded_department_routing(user_input: str) -> str:
+    # Used when the LLM upstream is unhealthy: the local model's best guess at
+    # any confidence, else the 24/7 general IT desk.
+    if _local_classifier is not None:
+        return _local_classifier.predict(user_input)[0]
+    return FALLBACK_DEPARTMENT
+
+GUARDRAIL_MODE = os.environ.get("RADBIT_GUARDRAIL_MODE", "parallel")
+_cascade = CascadeConfig.from_env()
+
+async def acascade_department(user_input: str) -> str:
+    # Cheap model first; escalate to the full triage agent when it is unsure
+    # or disagrees with a reasonably confident local-model guess.
+    ta = _agents()
+    if _cascade.enabled:
+        try:
+            label, confidence, _ = await asmall_model_label(
+                "triage", ta.triage_agent.instructions, list(SUPPORT_DIRECTORY), user_input, _cascade
+            )
+        except Exception:
+            reason = "error"
+        else:
+            reason = "confident" if confidence >= _cascade.threshold else "low_confidence"
+            if reason == "confident" and _local_classifier is not None:
+                local_label, local_confidence, _ = _local_classifier.predict(user_input)
+                if local_label != label and local_confidence >= _cascade.disagreement_confidence:
+                    reason = "disagree"
+            if reason == "confident":
+                record_tier("triage", "small", reason)
+                return label
+        record_tier("triage", "large", reason)
+    tri = await gateway.acall("triage", lambda: ta.Runner.run(ta.unguarded_triage_agent, user_input))
+    metrics.record_usage("triage_llm", _run_usage(tri))
+    return tri.final_output.department
+
+async def arun_guarded_triage(user_input: str) -> str:
+    InputGuardrailTripwireTriggered = _agents().InputGuardrailTripwireTriggered
+    if GUARDRAIL_MODE == "sequential":
+        verdict = await ascope_check(user_input)
+        if verdict.tripwire_triggered:
+            raise InputGuardrailTripwireTriggered(verdict)
+        return await acascade_department(user_input)
+    check = asyncio.create_task(ascope_check(user_input))
+    tri = asyncio.create_task(acascade_department(user_input))
+    try:
+        verdict = await check
+        if verdict.tripwire_triggered:
+            raise InputGuardrailTripwireTriggered(verdict)
+    except BaseException:
+        tri.cancel()
+        if tri.done() and not tri.cancelled():
+            tri.exception()
+        raise
+    return await tri
 
 SUPPORT_DIRECTORY = {
     "Hospital Reading Rooms": {
@@ -148,6 +226,79 @@ SUPPORT_DIRECTORY = {
     },
 }
 
+_triage_cache = TriageCache(
+    os.environ.get("RADBIT_TRIAGE_CACHE", "triage_cache.sqlite3") or None,
+    ttl=float(os.environ.get("RADBIT_TRIAGE_CACHE_TTL", 7 * 24 * 3600)),
+    max_entries=int(os.environ.get("RADBIT_TRIAGE_CACHE_SIZE", 1024)),
+)
+
+def _triage_fingerprint() -> str:
+    ta = _agents()
+    return registry.get("triage_fingerprint", lambda: agent_fingerprint(ta.triage_agent, ta.guardrail_filter_agent))
+metrics.add_collector(lambda: {f"radbit_triage_cache_{k}": v for k, v in _triage_cache.stats().items()})
+_email_cache = TriageCache(
+    os.environ.get("RADBIT_TRIAGE_CACHE", "triage_cache.sqlite3") or None,
+    ttl=float(os.environ.get("RADBIT_EMAIL_CACHE_TTL", 24 * 3600)),
+    max_entries=int(os.environ.get("RADBIT_EMAIL_CACHE_SIZE", 256)),
+    table="email_draft_cache",
+)
+_triage_flight = SingleFlight("triage")
+_email_flight = SingleFlight("email_draft")
+
+def _priority(user_input: str, priority: Priority | None) -> Priority:
+    return ticket_priority(user_input) if priority is None else priority
+
+def _flight_key(key: str, priority: Priority) -> str:
+    # The leader's admission gate decides for every waiter, so only calls of
+    # the same priority class share a flight: a shed low-priority FAQ lookup
+    # must not hand its fallback to a critical ticket.
+    return f"{key}:{priority.name.lower()}"
+
+async def _acached_triage(user_input: str, priority: Priority | None = None,
+                          rate_limiter=None) -> tuple[str, str]:
+    priority = _priority(user_input, priority)
+    key = _triage_cache.make_key(user_input, _triage_fingerprint())
+    with metrics.span("triage_cache"):
+        cached = _triage_cache.get(key)
+    if cached is not None:
+        return cached, "cache"
+    (dept, tier), shared = await _triage_flight.do(
+        _flight_key(key, priority), lambda: _allm_triage(user_input, key, priority, rate_limiter)
+    )
+    return dept, "coalesced" if shared and tier == "llm" else tier
+
+async def _allm_triage(user_input: str, key: str, priority: Priority, rate_limiter=None) -> tuple[str, str]:
+    # Admission always applies; a caller's rate limiter (bulk --rate) only
+    # paces the calls that were admitted.
+    try:
+        async with admission.gate(priority, "triage"), rate_limiter or contextlib.nullcontext():
+            with metrics.span("triage_llm"):
+                dept = await arun_guarded_triage(user_input)
+    except DEGRADE_ERRORS:
+        return degraded_department_routing(user_input), "fallback"
+    if dept in SUPPORT_DIRECTORY:
+        _triage_cache.put(key, dept)
+    return dept, "llm"
+
+async def atriage_department(user_input: str) -> str:
+    dept, _ = await _acached_triage(user_input)
+    return dept
+
+async def aclassify_department(user_input: str, priority: Priority | None = None,
+                               rate_limiter=None) -> tuple[str, str]:
+    user_input = condensed_input(user_input)
+    with metrics.span("keyword"):
+        dept = keyword_based_department_routing(user_input)
+    tier = "keyword"
+    if not dept:
+        with metrics.span("local_model"):
+            dept = local_department_routing(user_input)
+        tier = "local"
+    if not dept:
+        dept, tier = await _acached_triage(user_input, priority, rate_limiter)
+    metrics.inc("radbit_routing_tier_total", tier=tier)
+    return dept, tier
+
 def run_async_task(task):
     try:
         loop = asyncio.get_event_loop()
@@ -156,63 +307,16 @@ def run_async_task(task):
         asyncio.set_event_loop(loop)
     return loop.run_until_complete(task)
 
-def parse_hours_string(hours_string: str):
-    s = hours_string.strip()
-    if s == "24/7":
-        return ("00:00", "23:59")
-    if "," in s:
-        _, part = s.split(",", 1)
-        s = part.strip()
-    if "–" in s:
-        a, b = s.split("–", 1)
-        clean = lambda t: t.replace(" ", "").replace(" ", "")
-        try:
-            return (
-                datetime.strptime(clean(a), "%I%p").strftime("%H:%M"),
-                datetime.strptime(clean(b), "%I%p").strftime("%H:%M"),
-            )
-        except:
-            return None
-    return None
-
-def load_backend_json(path="fake_backend_data.json", index=0):
-    with open(path, "r") as f:
-        arr = json.load(f)
-    return arr[index]
-
-def triage_and_get_support_info(user_input: str, scenario_index: int = 0) -> SupportResponse:
-    dept = keyword_based_department_routing(user_input)
-    if not dept:
-        tri = run_async_task(Runner.run(triage_agent, user_input))
-        dept = tri.final_output.department
-    if dept not in SUPPORT_DIRECTORY:
-        raise ValueError(f"Triage failed, got {dept!r}")
+BACKEND_PATH = os.environ.get("RADBIT_BACKEND_PATH", "fake_backend_data.json")
 
-    backend = load_backend_json(index=scenario_index)
-    user_meta = backend["user"]
-    ts_meta   = backend["timestamp"]
+def load_backend_json(path=None, index=0):
+    return open_store(path or BACKEND_PATH).get(index)
 
-    name     = user_meta["name"]
-    t_str    = ts_meta["time"].split()[0]
-    date_str = ts_meta["date"]
-    dow      = ts_meta["day_of_week"]
-    weekend  = ts_meta["is_weekend_or_holiday"].lower() == "yes"
+def load_backend_by_cwid(cwid: str, path=None) -> dict | None:
+    return open_store(path or BACKEND_PATH).get_by_cwid(cwid)
 
-    info = SUPPORT_DIRECTORY[dept]
-
-    now = datetime.strptime(t_str, "%H:%M:%S")
-    support_ok = True
-    fallback = "Radiqal"
-    if info["hours"].strip() != "24/7":
-        rng = parse_hours_string(info["hours"])
-        if rng:
-            start = datetime.strptime(rng[0], "%H:%M")
-            end   = datetime.strptime(rng[1], "%H:%M")
-            is_hol = date_str in holidays.US()
-            if not (start <= now <= end) or dow in ("Sat","Sun") or weekend or is_hol:
-                support_ok = False
-
-    msgs = [
+def email_draft_messages(user_input: str, name: str) -> list[dict]:
+    return [
         {
             "role": "system",
             "content": (
@@ -225,14 +329,139 @@ def triage_and_get_support_info(user_input: str, scenario_index: int = 0) -> Sup
         },
         {"role": "user", "content": user_input},
     ]
-    resp = _client.chat.completions.create(
-        model="gpt-4o",
-        messages=msgs,
-        temperature=0.5,
+
+# Where to send a ticket when its department is closed, in order. Badge and
+# password issues go to the 24/7 WCINYP IT desk, never to the critical
+# clinical PACS line.
+FALLBACK_PREFERENCES = {
+    "Hospital Reading Rooms": ["WCINYP IT"],
+    "Virtual HelpDesk": ["WCINYP IT"],
+    "WCINYP IT": ["Hospital Reading Rooms", "Virtual HelpDesk"],
+    "Radiqal": ["WCINYP IT"],
+}
+_availability = registry.get("availability", lambda: AvailabilityEngine(SUPPORT_DIRECTORY, fallbacks=FALLBACK_PREFERENCES))
+
+def _scenario_time(ts_meta: dict) -> tuple[datetime, bool]:
+    when = datetime.strptime(f"{ts_meta['date']} {ts_meta['time'].split()[0]}", "%Y-%m-%d %H:%M:%S")
+    holiday = ts_meta["is_weekend_or_holiday"].lower() == "yes" and when.weekday() < 5
+    return when, holiday or None
+
+def department_availability(dept: str, ts_meta: dict) -> tuple[bool, str | None]:
+    when, holiday = _scenario_time(ts_meta)
+    if _availability.is_open(dept, when, holiday):
+        return True, None
+    return False, _availability.fallback_department(dept, when, holiday)
+
+def availability_by_department(ts_meta: dict) -> dict[str, tuple[bool, str | None]]:
+    with metrics.span("availability"):
+        return {dept: department_availability(dept, ts_meta) for dept in SUPPORT_DIRECTORY}
+
+async def aroute_department_tier(user_input: str) -> tuple[str, str]:
+    dept, tier = await aclassify_department(user_input)
+    if dept not in SUPPORT_DIRECTORY:
+        raise ValueError(f"Triage failed, got {dept!r}")
+    return dept, tier
+
+async def aroute_department(user_input: str) -> str:
+    dept, _ = await aroute_department_tier(user_input)
+    return dept
+
+def fallback_email_draft(user_input: str, name: str) -> str:
+    return f"To whom it may concern,\n\n{user_input}\n\nThank you,\n{name}"
+
+def _email_cache_key(user_input: str, name: str) -> str:
+    prompt = json.dumps(email_draft_messages("", name))
+    return _email_cache.make_key(user_input, hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16])
+
+async def adraft_email(user_input: str, name: str, priority: Priority | None = None, rate_limiter=None) -> str:
+    email_text, _ = await adraft_email_tier(user_input, name, priority, rate_limiter)
+    return email_text
+
+async def adraft_email_tier(user_input: str, name: str, priority: Priority | None = None,
+                            rate_limiter=None) -> tuple[str, str]:
+    # The tier is "fallback" when the upstream was unhealthy or the request
+    # was shed and the plain template stands in for the draft.
+    user_input = condensed_input(user_input)
+    key = _email_cache_key(user_input, name)
+    cached = _email_cache.get(key)
+    if cached is not None:
+        return cached, "cache"
+    priority = _priority(user_input, priority)
+    (email_text, tier), _ = await _email_flight.do(
+        _flight_key(key, priority), lambda: _adraft_email(user_input, name, key, priority, rate_limiter)
     )
+    return email_text, tier
+
+async def _adraft_email(user_input: str, name: str, key: str, priority: Priority,
+                        rate_limiter=None) -> tuple[str, str]:
+    try:
+        async with admission.gate(priority, "email"), rate_limiter or contextlib.nullcontext():
+            with metrics.span("email_draft"):
+                resp = await gateway.acall("email_draft", lambda: gateway.client().chat.completions.create(
+                    model="gpt-4o",
+                    messages=email_draft_messages(user_input, name),
+                    temperature=0.5,
+                ))
+    except DEGRADE_ERRORS:
+        return fallback_email_draft(user_input, name), "fallback"
+    metrics.record_usage("email_draft", resp.usage)
     email_text = resp.choices[0].message.content.strip()
+    _email_cache.put(key, email_text)
+    return email_text, "llm"
+
+async def astream_email_draft(user_input: str, name: str) -> AsyncIterator[str]:
+    user_input = condensed_input(user_input)
+    key = _email_cache_key(user_input, name)
+    cached = _email_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    try:
+        await admission.acquire(ticket_priority(user_input), "email")
+    except AdmissionRejected:
+        yield fallback_email_draft(user_input, name)
+        return
+    try:
+        try:
+            with metrics.span("email_first_token"):
+                stream = await gateway.acall("email_draft", lambda: gateway.client().chat.completions.create(
+                    model="gpt-4o",
+                    messages=email_draft_messages(user_input, name),
+                    temperature=0.5,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ))
+        except UPSTREAM_ERRORS:
+            yield fallback_email_draft(user_input, name)
+            return
+        parts = []
+        with metrics.span("email_stream"):
+            async for chunk in stream:
+                if chunk.usage:
+                    metrics.record_usage("email_draft", chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    piece = chunk.choices[0].delta.content
+                    if not parts:
+                        piece = piece.lstrip()
+                    parts.append(piece)
+                    yield piece
+        _email_cache.put(key, "".join(parts).strip())
+    finally:
+        admission.release()
+
+def stream_email_draft(user_input: str, scenario_index: int = 0) -> Iterator[str]:
+    name = load_backend_json(index=scenario_index)["user"]["name"]
+    chunks = astream_email_draft(user_input, name)
+    while True:
+        try:
+            yield run_async_task(chunks.__anext__())
+        except StopAsyncIteration:
+            return
 
-    return SupportResponse(
+def build_support_response(dept: str, email_text: str, support_ok: bool,
+                           fallback: str | None = None, tier: str | None = None) -> "SupportResponse":
+    info = SUPPORT_DIRECTORY[dept]
+    return _schemas().SupportResponse(
         department=dept,
         phone=info["phone"],
         email=info["email"],
@@ -242,13 +471,96 @@ def triage_and_get_support_info(user_input: str, scenario_index: int = 0) -> Sup
         email_draft=email_text,
         support_available=support_ok,
         fallback_department=fallback,
+        routing_tier=tier,
     )
 
-def generate_faqs(history: list[dict]) -> list[dict]:
+async def _first_call(name: str, aw):
+    start = time.perf_counter()
+    try:
+        return await aw
+    finally:
+        registry.record_once(f"first_request.{name}", time.perf_counter() - start)
+
+async def atriage_and_get_support_info(user_input: str, scenario_index: int = 0) -> "SupportResponse":
+    with metrics.span("triage_total"):
+        return await _first_call("triage", _atriage_and_get_support_info(user_input, scenario_index))
+
+async def _atriage_and_get_support_info(user_input: str, scenario_index: int) -> "SupportResponse":
+    with metrics.span("backend_load"):
+        backend = load_backend_json(index=scenario_index)
+    name    = backend["user"]["name"]
+    ts_meta = backend["timestamp"]
+
+    # The email prompt does not depend on the department, so routing and
+    # drafting run at once. Availability is a bisect over compiled schedules
+    # and is answered inline once the department is known.
+    dept_task  = asyncio.create_task(aroute_department_tier(user_input))
+    email_task = asyncio.create_task(adraft_email(user_input, name))
+    try:
+        dept, tier = await dept_task
+    except BaseException:
+        email_task.cancel()
+        raise
+    with metrics.span("availability"):
+        availability = department_availability(dept, ts_meta)
+    email_text = await email_task
+
+    return build_support_response(dept, email_text, *availability, tier=tier)
+
+async def aroute_support_info(user_input: str, scenario_index: int = 0) -> "SupportResponse":
+    with metrics.span("route_total"):
+        return await _first_call("route", _aroute_support_info(user_input, scenario_index))
+
+async def _aroute_support_info(user_input: str, scenario_index: int) -> "SupportResponse":
+    # Routing and availability only; the email draft is left empty for
+    # stream_email_draft to fill in afterwards.
+    with metrics.span("backend_load"):
+        backend = load_backend_json(index=scenario_index)
+    dept, tier = await aroute_department_tier(user_input)
+    with metrics.span("availability"):
+        availability = department_availability(dept, backend["timestamp"])
+    return build_support_response(dept, "", *availability, tier=tier)
+
+def route_support_info(user_input: str, scenario_index: int = 0) -> "SupportResponse":
+    return run_async_task(aroute_support_info(user_input, scenario_index))
+
+def triage_and_get_support_info(user_input: str, scenario_index: int = 0) -> "SupportResponse":
+    return run_async_task(atriage_and_get_support_info(user_input, scenario_index))
+
+async def _faq_answer(faq: dict) -> dict:
+    input_example = faq.get("input_example", "")
+    dept, _ = await aclassify_department(input_example, priority=Priority.LOW)
+    contact = SUPPORT_DIRECTORY.get(dept, {})
+    steps = faq.get("steps", [])
+    answer = "\n### Self-Help Steps\n" + "\n".join(f"{i+1}. {s}" for i, s in enumerate(steps))
+    answer += "\n\n### Recommended Support Contact"
+    answer += f"\n**Department**: {dept}"
+    if contact.get("phone"):
+        answer += f"\n**Phone**: {contact['phone']}"
+    if contact.get("email"):
+        answer += f"\n**Email**: {contact['email']}"
+    return {"question": faq.get("question", "FAQ"), "answer": answer}
+
+FAQ_PROMPT_INPUTS = int(os.environ.get("RADBIT_FAQ_PROMPT_INPUTS", 20))
+FAQ_TOKEN_BUDGET = int(os.environ.get("RADBIT_FAQ_TOKEN_BUDGET", 1024))
+
+async def agenerate_faqs(history: list[dict], strict: bool = False) -> list[dict]:
+    # strict: raise on failure instead of returning an error FAQ, so a cached
+    # digest is never replaced by (or persisted as) a transient error.
+    with metrics.span("faq_total"):
+        return await _first_call("faqs", _agenerate_faqs(history, strict))
+
+async def _agenerate_faqs(history: list[dict], strict: bool = False) -> list[dict]:
     if not history:
         return []
 
-    inputs = [entry["input"] for entry in history][-20:]
+    # The history is the digest window; the prompt gets its most recurring
+    # distinct requests (latest wording of each), capped to keep it bounded.
+    recurrence = Counter(normalize_text(entry["input"]) for entry in history)
+    wording = {normalize_text(entry["input"]): entry["input"] for entry in history}
+    inputs = [wording[key] for key, _ in recurrence.most_common(FAQ_PROMPT_INPUTS)]
+    budget = split_budget(FAQ_TOKEN_BUDGET, len(inputs))
+    inputs = [condensed_input(text, budget) for text in inputs]
 
     system_msg = {
         "role": "system",
@@ -268,11 +580,16 @@ def generate_faqs(history: list[dict]) -> list[dict]:
     }
 
     try:
-        llm = _client.chat.completions.create(
-            model="gpt-4o",
-            messages=[system_msg, user_msg],
-            temperature=0.3,
-        )
+        # The digest is background work: when no slot is free right now the
+        # refresh is skipped and the previous digest stays up.
+        async with admission.gate(Priority.LOW, "faq", max_wait=0):
+            with metrics.span("faq_cluster"):
+                llm = await gateway.acall("faq_cluster", lambda: gateway.client().chat.completions.create(
+                    model="gpt-4o",
+                    messages=[system_msg, user_msg],
+                    temperature=0.3,
+                ))
+        metrics.record_usage("faq_cluster", llm.usage)
         content = llm.choices[0].message.content.strip()
         if content.startswith("```json"):
             content = content.removeprefix("```json").removesuffix("```").strip()
@@ -280,25 +597,35 @@ def generate_faqs(history: list[dict]) -> list[dict]:
         if isinstance(parsed, str):
             parsed = json.loads(parsed)
 
-        results = []
-        for faq in parsed:
-            input_example = faq.get("input_example", "")
-            dept = keyword_based_department_routing(input_example)
-            if not dept:
-                triage = run_async_task(Runner.run(triage_agent, input_example))
-                dept = triage.final_output.department
-            contact = SUPPORT_DIRECTORY.get(dept, {})
-            steps = faq.get("steps", [])
-            answer = "\n### Self-Help Steps\n" + "\n".join(f"{i+1}. {s}" for i, s in enumerate(steps))
-            answer += "\n\n### Recommended Support Contact"
-            answer += f"\n**Department**: {dept}"
-            if contact.get("phone"):
-                answer += f"\n**Phone**: {contact['phone']}"
-            if contact.get("email"):
-                answer += f"\n**Email**: {contact['email']}"
-            results.append({"question": faq.get("question", "FAQ"), "answer": answer})
-
-        return results
+        with metrics.span("faq_triage"):
+            return list(await asyncio.gather(*(_faq_answer(faq) for faq in parsed)))
 
+    except AdmissionRejected:
+        raise
     except Exception as e:
+        if strict:
+            raise
         return [{"question": "OpenAI API call failed", "answer": str(e)}]
+
+def generate_faqs(history: list[dict], strict: bool = False) -> list[dict]:
+    return run_async_task(agenerate_faqs(history, strict))
+
+def warm_up(background: bool = False):
+    # Pays the first LLM-tier request's one-off costs (SDK imports, agent
+    # construction, this year's holiday calendar) ahead of time.
+    def run():
+        openai_module()
+        _schemas()
+        _triage_fingerprint()
+        year = datetime.now().year
+        registry.get(f"holidays.{year}", lambda: holiday_dates(year))
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, daemon=True, name="radbit-warm-up")
+    thread.start()
+    return thread
+
+metrics.add_collector(lambda: {f"radbit_startup_{k.replace('.', '_')}_seconds": v for k, v in registry.report().items()})
+registry.record_once("import.radbit", time.perf_counter() - _import_started)
@@ -1,18 +1,43 @@
 import streamlit as st
-import json
 import os
 from datetime import datetime
-from agents import set_default_openai_key, InputGuardrailTripwireTriggered
-from radbit import triage_and_get_support_info, generate_faqs, load_backend_json
+from history_log import HistoryLog, TIMESTAMP_FORMAT
+from history_index import HistoryIndex
+from faq_digest import FaqDigest
+from metrics import metrics, trace
 
-#set_default_openai_key(st.secrets["OPENAI_API_KEY"])
-if 'OPENAI_API_KEY' in os.environ:
-    set_default_openai_key(os.environ["OPENAI_API_KEY"])
-else:
-    set_default_openai_key(st.secrets["OPENAI_API_KEY"])
+# Both the OpenAI client and the agents SDK read the key from the
+# environment, so the SDK is not imported just to configure it.
+if 'OPENAI_API_KEY' not in os.environ:
+    os.environ["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
 
 st.set_page_config(page_title="Radiology Support", layout="wide")
 
+# With RADBIT_SERVICE_URL set (http://host:port or unix:///path.sock) the UI is
+# a thin client of triage_service.py and shares its workers and caches.
+if os.environ.get("RADBIT_SERVICE_URL"):
+    from triage_service import TriageClient
+
+    @st.cache_resource
+    def get_triage_client() -> TriageClient:
+        return TriageClient(os.environ["RADBIT_SERVICE_URL"])
+
+    _backend = get_triage_client()
+    route_support_info = _backend.route_support_info
+    stream_email_draft = _backend.stream_email_draft
+    generate_faqs = _backend.generate_faqs
+    load_backend_json = _backend.load_backend_json
+else:
+    from radbit import route_support_info, stream_email_draft, generate_faqs, load_backend_json, warm_up
+
+    # Once per process, off the script thread: the first page renders while
+    # the SDK and agents load.
+    @st.cache_resource
+    def start_warm_up():
+        return warm_up(background=True)
+
+    start_warm_up()
+
 params = st.query_params
 raw = params.get("scenario", "0")
 try:
@@ -20,7 +45,11 @@ try:
 except:
     scenario_index = 0
 
-backend_meta = load_backend_json(index=scenario_index)
+@st.cache_data(ttl=60)
+def get_backend_meta(index: int) -> dict:
+    return load_backend_json(index=index)
+
+backend_meta = get_backend_meta(scenario_index)
 ts = backend_meta["timestamp"]
 
 with st.sidebar:
@@ -29,7 +58,21 @@ with st.sidebar:
     st.markdown(f"**Time:** {ts['time']}")
     st.markdown(f"**Day:** {ts['day_of_week']}")
 
-HISTORY_FILE = "triage_history.json"
+@st.cache_resource
+def get_history_log() -> HistoryLog:
+    return HistoryLog()
+
+@st.cache_resource
+def get_history_index() -> HistoryIndex:
+    return HistoryIndex(get_history_log())
+
+@st.cache_resource
+def get_faq_digest() -> FaqDigest:
+    return FaqDigest(lambda history: generate_faqs(history, strict=True))
+
+history_log = get_history_log()
+history_index = get_history_index()
+faq_digest = get_faq_digest()
 
 if "user_input" not in st.session_state:
     st.session_state.user_input = ""
@@ -39,12 +82,10 @@ if "show_email_draft" not in st.session_state:
     st.session_state.show_email_draft = False
 if "last_submitted_input" not in st.session_state:
     st.session_state.last_submitted_input = ""
-if "history" not in st.session_state:
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r") as f:
-            st.session_state.history = json.load(f)
-    else:
-        st.session_state.history = []
+if "last_timings" not in st.session_state:
+    st.session_state.last_timings = []
+
+recent_history = history_index.latest(10)
 
 st.title("Radiology Support Portal")
 st.markdown("Please describe your issue below and we’ll route you to the correct support group and provide contact options.")
@@ -64,16 +105,19 @@ with left:
     st.session_state.user_input = current_input
 
     if submit and current_input.strip():
+        from agents import InputGuardrailTripwireTriggered
         try:
-            with st.spinner("Identifying your request..."):
-                result = triage_and_get_support_info(current_input.strip(), scenario_index=scenario_index)
+            with st.spinner("Identifying your request..."), trace() as spans:
+                result = route_support_info(current_input.strip(), scenario_index=scenario_index)
+                st.session_state.last_timings = list(spans)
                 st.session_state.triage_result = result
                 st.session_state.show_email_draft = True
                 st.session_state.last_submitted_input = current_input.strip()
                 entry = {
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "timestamp": datetime.now().strftime(TIMESTAMP_FORMAT),
                     "input": current_input.strip(),
                     "department": result.department,
+                    "routing_tier": getattr(result, "routing_tier", None),
                     "contact_info": {
                         "Department": result.department,
                         "Phone": result.phone,
@@ -85,9 +129,8 @@ with left:
                         "Fallback": result.fallback_department or "None"
                     }
                 }
-                st.session_state.history.append(entry)
-                with open(HISTORY_FILE, "w") as f:
-                    json.dump(st.session_state.history, f, indent=2)
+                history_log.append(entry)
+                recent_history = history_index.latest(10)
         except InputGuardrailTripwireTriggered:
             st.session_state.triage_result = None
             st.session_state.show_email_draft = False
@@ -99,6 +142,8 @@ with left:
         r = st.session_state.triage_result
         st.markdown("### Recommended Support Contact")
         st.markdown(f"**Department:** {r.department}")
+        if getattr(r, "routing_tier", None) == "fallback":
+            st.warning("Triage is temporarily degraded, so this department is a best guess. Please double-check before contacting them.")
         st.markdown(f"**Phone:** {r.phone}")
         st.markdown("**Email:**")
         if r.department == 'WCINYP IT':
@@ -136,18 +181,27 @@ with right:
             f"- Fluency Version: {it_context.get('fluency_version', 'N/A')}",
             f"- OS Version: {it_context.get('os_version', 'N/A')}"
         ]
-        email_with_footer = st.session_state.triage_result.email_draft + "\n" + "\n".join(footer_lines)
-        st.text_area("Edit before sending", value=email_with_footer, height=400, key="email_draft_box")
+        r = st.session_state.triage_result
+        draft_box = st.empty()
+        if not r.email_draft:
+            try:
+                with draft_box.container():
+                    r.email_draft = st.write_stream(
+                        stream_email_draft(st.session_state.last_submitted_input, scenario_index)
+                    )
+            except Exception as e:
+                st.error(f"Could not draft the email: {e}")
+        email_with_footer = r.email_draft + "\n" + "\n".join(footer_lines)
+        draft_box.text_area("Edit before sending", value=email_with_footer, height=400, key="email_draft_box")
         st.button("Send Email", disabled=True)
 
 st.divider()
 
 with st.expander("Request History", expanded=False):
     if st.button("Clear History"):
-        st.session_state.history = []
-        if os.path.exists(HISTORY_FILE):
-            os.remove(HISTORY_FILE)
-    for entry in reversed(st.session_state.history[-10:]):
+        history_log.clear()
+        recent_history = []
+    for entry in reversed(recent_history):
         st.markdown(f"**{entry['timestamp']}**")
         st.markdown(f"- Input: {entry['input']}")
         st.markdown(f"- Department: {entry['department']}")
@@ -159,10 +213,23 @@ with st.expander("Request History", expanded=False):
 
 st.divider()
 
-faqs = generate_faqs(st.session_state.history)
+day_since, now = history_index.last(24)
+# The window's entries are only read from disk when its fingerprint changes.
+faq_digest.refresh_window(
+    history_index.fingerprint(day_since, now), lambda: history_index.between(day_since, now)
+)
+faqs = faq_digest.latest()
+digest_count = history_index.count(day_since, now)
 with st.expander("24-Hour Digest & FAQs", expanded=False):
-    if not st.session_state.history:
-        st.markdown("No requests have been submitted yet for the digest.")
+    if digest_count:
+        by_department = history_index.counts_by_department(day_since, now)
+        st.markdown(f"**{digest_count} requests in the last 24 hours:** " + ", ".join(
+            f"{dept} ({count})" for dept, count in sorted(by_department.items(), key=lambda kv: -kv[1])
+        ))
+    if not digest_count:
+        st.markdown("No requests have been submitted in the last 24 hours for the digest.")
+    elif not faqs and faq_digest.refreshing:
+        st.markdown("The digest is being generated and will appear shortly.")
     elif not faqs:
         st.markdown("Requests found, but no FAQs could be generated.")
     else:
@@ -170,3 +237,11 @@ with st.expander("24-Hour Digest & FAQs", expanded=False):
             st.markdown(f"**Q: {faq['question']}**")
             st.markdown(f"A: {faq['answer']}") 
             st.markdown("---")
+
+if metrics.enabled:
+    with st.sidebar:
+        st.markdown("### Timings")
+        if not st.session_state.last_timings:
+            st.markdown("Submit a request to see stage timings.")
+        for stage, seconds in st.session_state.last_timings:
+            st.markdown(f"- {stage}: {seconds * 1000:.0f} ms")
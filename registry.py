@@ -0,0 +1,41 @@
+import threading
+import time
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+class Registry:
+    # Process-wide home for expensive, read-only objects (agents, SDK
+    # modules, compiled schedules, holiday calendars). Each is built on first
+    # use, at most once, and its build time is kept for the startup report.
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._items: dict[str, object] = {}
+        self._timings: dict[str, float] = {}
+
+    def get(self, name: str, factory: Callable[[], T]) -> T:
+        item = self._items.get(name, _MISSING)
+        if item is not _MISSING:
+            return item
+        with self._lock:
+            item = self._items.get(name, _MISSING)
+            if item is _MISSING:
+                start = time.perf_counter()
+                item = self._items[name] = factory()
+                self._timings[f"build.{name}"] = time.perf_counter() - start
+            return item
+
+    def loaded(self, name: str) -> bool:
+        return name in self._items
+
+    def record_once(self, name: str, seconds: float):
+        with self._lock:
+            self._timings.setdefault(name, seconds)
+
+    def report(self) -> dict[str, float]:
+        with self._lock:
+            return {name: round(seconds, 6) for name, seconds in self._timings.items()}
+
+registry = Registry()
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+class SupportResponse(BaseModel):
+    department: str
+    phone: str
+    email: str
+    other: str
+    note: str
+    hours: str
+    email_draft: str
+    support_available: bool = True
+    fallback_department: str | None = None
+    routing_tier: str | None = None
+
+class DepartmentLabel(BaseModel):
+    department: str
+
+class OutOfScopeCheck(BaseModel):
+    is_off_topic: bool
+    explanation: str
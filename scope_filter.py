@@ -0,0 +1,30 @@
+import re
+
+# Product and system names that only show up in genuine radiology/IT support
+# requests. A match clears the scope guardrail locally, unless an off-topic
+# marker is present; everything else goes to the guardrail.
+IN_SCOPE_TERMS = [
+    "pacs", "vuepacs", "vue pacs", "fluency", "medicalis", "radiqal", "vpn", "citrix",
+    "stat dx", "olea", "terarecon", "dynacad", "g hub",
+]
+OFF_TOPIC_MARKERS = [
+    "meaning of life", "philosoph", "existential", "god", "religion", "poem", "joke", "recipe",
+    "politic", "election", "stock", "horoscope", "homework", "love", "consciousness",
+]
+
+def _compile(terms: list[str], prefix_only: bool = False) -> re.Pattern:
+    alternatives = "|".join(re.escape(t).replace(r"\ ", r"[\s\-]*") for t in terms)
+    suffix = "" if prefix_only else r"(?!\w)"
+    return re.compile(rf"(?<!\w)(?:{alternatives}){suffix}", re.IGNORECASE)
+
+_IN_SCOPE = _compile(IN_SCOPE_TERMS)
+_OFF_TOPIC = _compile(OFF_TOPIC_MARKERS, prefix_only=True)
+
+def in_scope_match(text: str) -> str | None:
+    if _OFF_TOPIC.search(text):
+        return None
+    m = _IN_SCOPE.search(text)
+    return m.group(0) if m else None
+
+def is_clearly_in_scope(text: str) -> bool:
+    return in_scope_match(text) is not None
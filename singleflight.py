@@ -0,0 +1,73 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from metrics import metrics
+
+T = TypeVar("T")
+
+class _LeaderCancelled(Exception):
+    pass
+
+class SingleFlight:
+    # Shares one in-flight call per key among concurrent callers. Callers may
+    # sit on different threads and event loops (one per Streamlit session), so
+    # the shared result travels through a concurrent.futures.Future.
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, concurrent.futures.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        metrics.add_collector(self._gauges)
+
+    def _gauges(self) -> dict[str, float]:
+        return {
+            f"radbit_singleflight_{self.name}_inflight": len(self._inflight),
+            f"radbit_singleflight_{self.name}_leaders": self.leaders,
+            f"radbit_singleflight_{self.name}_coalesced": self.coalesced,
+        }
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        while True:
+            with self._lock:
+                shared = self._inflight.get(key)
+                if shared is None:
+                    shared = self._inflight[key] = concurrent.futures.Future()
+                    self.leaders += 1
+                    leader = True
+                else:
+                    self.coalesced += 1
+                    leader = False
+            if leader:
+                return await self._lead(key, shared, fn), False
+            metrics.inc("radbit_singleflight_coalesced_total", call=self.name)
+            try:
+                # Shield so one waiter giving up does not cancel the shared call.
+                return await asyncio.shield(asyncio.wrap_future(shared)), True
+            except _LeaderCancelled:
+                continue
+
+    async def _lead(self, key: Hashable, shared: concurrent.futures.Future, fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self._finish(key)
+            shared.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            self._finish(key)
+            shared.set_exception(e)
+            raise
+        self._finish(key)
+        shared.set_result(result)
+        return result
+
+    def _finish(self, key: Hashable):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"inflight": len(self._inflight), "leaders": self.leaders, "coalesced": self.coalesced}
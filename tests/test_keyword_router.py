@@ -0,0 +1,57 @@
+import itertools
+
+import pytest
+
+from keyword_router import KeywordRouter, KeywordRule
+
+def legacy_routing(user_input: str) -> str | None:
+    # The any() scans the default table replaced.
+    text = user_input.lower()
+    if any(kw in text for kw in ["mouse speed", "gaming mouse", "change mouse sensitivity"]):
+        return "WCINYP IT"
+    if any(kw in text for kw in ["g hub", "mouse macro", "macros on my mouse"]):
+        return "Radiqal"
+    if any(kw in text for kw in ["screen scaling", "display scaling", "adjust display settings", "first time logging in"]):
+        return "WCINYP IT"
+    return None
+
+CASES = [
+    ("mouse macros broken", "Radiqal"),
+    ("my mouse speeds are off", "WCINYP IT"),
+    ("first time logging into PACS", "WCINYP IT"),
+    ("macros on my mouse speed", "WCINYP IT"),
+    ("Logitech G HUB won't start", "Radiqal"),
+    ("ghub won't start", None),
+    ("mouse-speed too fast", None),
+    ("my gaming mouse macro resets", "WCINYP IT"),
+    ("need to adjust display settings for screen scaling", "WCINYP IT"),
+    ("PACS viewer froze on a CT", None),
+    ("", None),
+]
+
+FRAGMENTS = [
+    "mouse speed", "gaming mouse", "change mouse sensitivity", "g hub", "mouse macro", "macros on my mouse",
+    "screen scaling", "display scaling", "adjust display settings", "first time logging in",
+    "mouse", "macros", "speeds", "PACS", "into",
+]
+
+@pytest.mark.parametrize("text,department", CASES)
+def test_default_rules_match_legacy_cases(text, department):
+    assert legacy_routing(text) == department
+    assert KeywordRouter().route(text) == department
+
+def test_default_rules_match_legacy_on_combinations():
+    router = KeywordRouter()
+    for a, b in itertools.permutations(FRAGMENTS, 2):
+        for text in (f"{a} {b}", f"{a}{b}", f"{a.upper()} {b}s"):
+            assert router.route(text) == legacy_routing(text), text
+
+def test_overlapping_match_prefers_priority():
+    router = KeywordRouter([KeywordRule("ab", "low", 1, word_boundary=False), KeywordRule("bc", "high", 2, word_boundary=False)])
+    assert router.route("abc") == "high"
+
+def test_fuzzy_word_boundary_rules():
+    router = KeywordRouter([KeywordRule("g hub", "Radiqal", 20)])
+    assert router.route("ghub crashed") == "Radiqal"
+    assert router.route("g-hub crashed") == "Radiqal"
+    assert router.route("bigghub") is None
@@ -0,0 +1,27 @@
+import asyncio
+import time
+
+import pytest
+
+from llm_gateway import CircuitBreaker, CircuitOpenError, LLMGateway
+
+def test_cancelled_probe_releases_half_open_slot():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        gateway = LLMGateway(timeout=5, retries=0, breaker=breaker)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.state == "half-open"
+
+        probe = asyncio.ensure_future(gateway.acall("probe", lambda: asyncio.sleep(60)))
+        await asyncio.sleep(0.01)
+        with pytest.raises(CircuitOpenError):
+            await gateway.acall("blocked", lambda: asyncio.sleep(0, "x"))
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert await gateway.acall("next", lambda: asyncio.sleep(0, "ok")) == "ok"
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
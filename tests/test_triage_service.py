@@ -0,0 +1,32 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import radbit
+import triage_service
+
+def test_abandoned_email_stream_does_not_poison_the_connection(monkeypatch):
+    async def slow_stream(user_input, name):
+        yield "Dear team,\n"
+        await asyncio.sleep(0.2)
+        yield "é" * 5000
+
+    monkeypatch.setattr(radbit, "astream_email_draft", slow_stream)
+    path = os.path.join(tempfile.mkdtemp(), "triage.sock")
+    threading.Thread(target=lambda: asyncio.run(triage_service.serve(unix_path=path)), daemon=True).start()
+    for _ in range(100):
+        if os.path.exists(path):
+            break
+        time.sleep(0.05)
+
+    client = triage_service.TriageClient(f"unix://{path}")
+    stream = client.stream_email_draft("my gaming mouse speed is too fast")
+    assert next(stream) == "Dear team,\n"
+    stream.close()
+
+    for _ in range(2):
+        result = client.route_support_info("my gaming mouse speed is too fast")
+        assert result.department == "WCINYP IT"
+    assert "".join(client.stream_email_draft("my gaming mouse speed is too fast")).endswith("é" * 5000)
@@ -0,0 +1,88 @@
+from agents import (
+    Agent,
+    Runner,
+    input_guardrail,
+    GuardrailFunctionOutput,
+    RunContextWrapper,
+    TResponseInputItem,
+    InputGuardrailTripwireTriggered,
+)
+
+from schemas import DepartmentLabel, OutOfScopeCheck
+
+guardrail_filter_agent = Agent(
+    name="Out-of-Scope Filter",
+    instructions="""
+Determine if the user's message is off-topic (philosophical, existential, etc.).
+Only allow clear radiology/IT support requests through.
+""",
+    output_type=OutOfScopeCheck,
+    model="gpt-4o",
+)
+
+@input_guardrail
+async def radiology_scope_guardrail(
+    ctx: RunContextWrapper[None],
+    agent: Agent,
+    input: str | list[TResponseInputItem],
+) -> GuardrailFunctionOutput:
+    from radbit import ascope_check
+    return await ascope_check(input, context=ctx.context)
+
+hospital_rr_agent = Agent(
+    name="Hospital Reading Rooms Agent",
+    instructions="Support for issues during image interpretation in PACS systems like viewer freezes, CT/MRI image crashes, or diagnostic disruptions.",
+    model="gpt-4o",
+)
+virtual_helpdesk_agent = Agent(
+    name="Virtual HelpDesk Agent",
+    instructions="Only handle in-hospital workstation access problems (e.g., badge logins, password resets, SSO/certificates). Do NOT handle workstation software, macros, display settings, PACS viewers, or hardware config.",
+    model="gpt-4o",
+)
+wcinyp_agent = Agent(
+    name="WCINYP IT Agent",
+    instructions="Handle home/remote setup issues (e.g., VPN, EPIC, Outlook, keyboard/mouse setup, display scaling, VuePACS config, hardware problems, software installs, peripheral calibration). Also covers first-time login setup.",
+    model="gpt-4o",
+)
+radiqal_agent = Agent(
+    name="Radiqal Agent",
+    instructions="Handle QA workflow breakdowns, missing templates, and system-specific issues in Radiqal, Fluency, or PACS integrations involving macros or viewer behaviors.",
+    model="gpt-4o",
+)
+
+triage_agent = Agent(
+    name="Support Triage Agent",
+    instructions="""
+Given a user support issue, choose exactly one of the following departments and return only JSON: 
+{"department": "Hospital Reading Rooms"}, 
+{"department": "Virtual HelpDesk"}, 
+{"department": "WCINYP IT"}, 
+{"department": "Radiqal"}
+
+Use this rule set:
+
+- WCINYP IT: Issues with display scaling, gaming mouse speed, duplicate dictation, VuePACS lossy images, Stat DX not launching, hardware setup, server address corrections (Olea/TeraRecon/Dynacad), monitor config, workstation behavior, or onboarding/first-login screen layout problems.
+
+- Radiqal: Issues involving macros in G HUB, missing or broken Fluency templates, inability to view outside studies in VuePACS, and all QA workflow/platform discrepancies or tip sheet-based platforms.
+
+- Hospital Reading Rooms: Crashes/freezes of the PACS viewer during interpretation, sudden PACS lockups, or reading disruptions that affect diagnostic throughput.
+
+- Virtual HelpDesk: In-hospital desktop login/certificate/access problems (badge, Duo, SSO), ONLY if no mention of hardware config or software calibration.
+
+Return JSON exactly like {"department": "Radiqal"}.
+""",
+    output_type=DepartmentLabel,
+    handoffs=[hospital_rr_agent, virtual_helpdesk_agent, wcinyp_agent, radiqal_agent],
+    model="gpt-4o",
+    input_guardrails=[radiology_scope_guardrail],
+)
+
+# Same agent without the attached guardrail, for running the scope check
+# alongside triage instead of in front of it.
+unguarded_triage_agent = Agent(
+    name=triage_agent.name,
+    instructions=triage_agent.instructions,
+    output_type=triage_agent.output_type,
+    handoffs=triage_agent.handoffs,
+    model=triage_agent.model,
+)
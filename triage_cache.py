@@ -0,0 +1,107 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+def agent_fingerprint(*agents) -> str:
+    parts = []
+    for agent in agents:
+        parts += [agent.name, agent.model, agent.instructions]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+class TriageCache:
+    def __init__(self, path: str | None = "triage_cache.sqlite3", ttl: float = 7 * 24 * 3600,
+                 max_entries: int = 1024, max_disk_entries: int = 50_000, table: str = "triage_cache"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.table = table
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._mem: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_created ON {table}(created)")
+
+    @staticmethod
+    def make_key(text: str, fingerprint: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{fingerprint}:{digest}"
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit and now - hit[0] <= self.ttl:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return hit[1]
+            if hit:
+                del self._mem[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now - row[1] <= self.ttl:
+                    self._remember(key, row[1], row[0])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, created) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+                self._puts += 1
+                if self._puts % 64 == 0:
+                    self._evict_disk(now)
+
+    def _remember(self, key: str, created: float, value: str):
+        self._mem[key] = (created, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _evict_disk(self, now: float):
+        self._db.execute(f"DELETE FROM {self.table} WHERE created < ?", (now - self.ttl,))
+        self._db.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f" SELECT key FROM {self.table} ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._mem),
+            }
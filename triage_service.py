@@ -0,0 +1,336 @@
+import argparse
+import asyncio
+import codecs
+import contextlib
+import http.client
+import json
+import os
+import signal
+import socket
+import threading
+from types import SimpleNamespace
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from metrics import metrics
+
+class QueueFullError(RuntimeError):
+    pass
+
+class WorkerPool:
+    # `workers` requests run at once; up to `max_queue` more wait for a slot
+    # and anything beyond that is rejected straight away.
+    def __init__(self, workers: int = 32, max_queue: int = 256):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.running = 0
+        self._sem = asyncio.Semaphore(workers)
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        if self._sem.locked() and self.waiting >= self.max_queue:
+            metrics.inc("radbit_service_rejected_total")
+            raise QueueFullError("triage service queue is full")
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._sem.release()
+
+class _Request:
+    def __init__(self, method: str, path: str, headers: dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> dict:
+        return json.loads(self.body or b"{}")
+
+async def _read_request(reader: asyncio.StreamReader) -> _Request | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        raw = await reader.readline()
+        if raw in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = raw.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return _Request(method, path, headers, body)
+
+def _head(status: int, reason: str, content_type: str, extra: dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {reason}", f"Content-Type: {content_type}"]
+    lines += [f"{k}: {v}" for k, v in extra.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+async def _send(writer: asyncio.StreamWriter, status: int, reason: str, payload, content_type="application/json"):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+    writer.write(_head(status, reason, content_type, {"Content-Length": str(len(body))}) + body)
+    await writer.drain()
+
+class _StreamAborted(Exception):
+    pass
+
+async def _send_stream(writer: asyncio.StreamWriter, chunks):
+    writer.write(_head(200, "OK", "text/plain; charset=utf-8", {"Transfer-Encoding": "chunked"}))
+    try:
+        async for piece in chunks:
+            data = piece.encode("utf-8")
+            if data:
+                writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+                await writer.drain()
+    except Exception as e:
+        # The 200 is already on the wire; no error response can follow it.
+        raise _StreamAborted(str(e)) from e
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+class TriageService:
+    def __init__(self, workers: int = 32, max_queue: int = 256):
+        import radbit
+        from admission import AdmissionRejected
+        from agents import InputGuardrailTripwireTriggered
+
+        radbit.warm_up()
+        self.radbit = radbit
+        self.tripwire_error = InputGuardrailTripwireTriggered
+        self.shed_error = AdmissionRejected
+        self.pool = WorkerPool(workers, max_queue)
+        metrics.add_collector(lambda: {
+            "radbit_service_waiting": self.pool.waiting,
+            "radbit_service_running": self.pool.running,
+        })
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                await self._dispatch(request, writer)
+                if request.headers.get("connection", "").lower() == "close":
+                    break
+        except _StreamAborted:
+            # Closing without the final chunk tells the client the body is
+            # incomplete.
+            metrics.inc("radbit_service_stream_aborted_total")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: _Request, writer: asyncio.StreamWriter):
+        r = self.radbit
+        route = (request.method, request.path.split("?", 1)[0])
+        try:
+            if route == ("GET", "/health"):
+                await _send(writer, 200, "OK", {"status": "ok", "waiting": self.pool.waiting,
+                                                "running": self.pool.running})
+            elif route == ("GET", "/metrics"):
+                await _send(writer, 200, "OK", metrics.render_prometheus().encode("utf-8"), "text/plain")
+            elif route == ("POST", "/scenario"):
+                body = request.json()
+                await _send(writer, 200, "OK", r.load_backend_json(index=body.get("scenario_index", 0)))
+            elif route == ("POST", "/route"):
+                body = request.json()
+                async with self.pool.slot():
+                    result = await r.aroute_support_info(body["input"], body.get("scenario_index", 0))
+                await _send(writer, 200, "OK", result.model_dump())
+            elif route == ("POST", "/triage"):
+                body = request.json()
+                async with self.pool.slot():
+                    result = await r.atriage_and_get_support_info(body["input"], body.get("scenario_index", 0))
+                await _send(writer, 200, "OK", result.model_dump())
+            elif route == ("POST", "/email"):
+                body = request.json()
+                name = r.load_backend_json(index=body.get("scenario_index", 0))["user"]["name"]
+                async with self.pool.slot():
+                    await _send_stream(writer, r.astream_email_draft(body["input"], name))
+            elif route == ("POST", "/faqs"):
+                body = request.json()
+                async with self.pool.slot():
+                    faqs = await r.agenerate_faqs(body.get("history", []), strict=bool(body.get("strict")))
+                await _send(writer, 200, "OK", faqs)
+            else:
+                await _send(writer, 404, "Not Found", {"error": f"no route for {route[0]} {route[1]}"})
+        except _StreamAborted:
+            raise
+        except (QueueFullError, self.shed_error) as e:
+            await _send(writer, 503, "Service Unavailable", {"error": str(e)})
+        except self.tripwire_error:
+            await _send(writer, 422, "Unprocessable Entity", {"error": "off_topic"})
+        except (KeyError, ValueError) as e:
+            await _send(writer, 400, "Bad Request", {"error": str(e)})
+        except Exception as e:
+            await _send(writer, 500, "Internal Server Error", {"error": str(e)})
+
+def _listen_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, unix_path: str | None = None,
+                workers: int = 32, max_queue: int = 256, reuse_port: bool = False):
+    service = TriageService(workers, max_queue)
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle, path=unix_path)
+    else:
+        server = await asyncio.start_server(service.handle, sock=_listen_socket(host, port, reuse_port))
+    async with server:
+        await server.serve_forever()
+
+def run_processes(processes: int, **kwargs):
+    # Pre-fork: every child binds the same port with SO_REUSEPORT and the
+    # kernel spreads connections across them. radbit is imported in each
+    # child after the fork so no SQLite handle crosses a fork.
+    children = []
+    for _ in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            asyncio.run(serve(reuse_port=True, **kwargs))
+            os._exit(0)
+        children.append(pid)
+
+    def stop(*_):
+        for pid in children:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        with contextlib.suppress(ChildProcessError):
+            os.waitpid(pid, 0)
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+class ServiceError(RuntimeError):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"triage service returned {status}: {message}")
+        self.status = status
+
+class TriageClient:
+    # Thin, thread-safe client with the same call surface radbit_UI.py uses
+    # from radbit. One keep-alive connection per calling thread.
+    def __init__(self, url: str, timeout: float = 120):
+        self.url = url
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            parts = urlsplit(self.url)
+            if parts.scheme == "unix":
+                conn = _UnixHTTPConnection(parts.path, self.timeout)
+            else:
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _post(self, path: str, payload: dict) -> http.client.HTTPResponse:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                resp = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, http.client.ResponseNotReady,
+                    http.client.CannotSendRequest, ConnectionError, BrokenPipeError):
+                # Stale keep-alive connection: reconnect once.
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        if resp.status == 422:
+            resp.read()
+            from agents import InputGuardrailTripwireTriggered
+            raise InputGuardrailTripwireTriggered("off_topic")
+        if resp.status >= 400:
+            raise ServiceError(resp.status, resp.read().decode("utf-8", "replace"))
+        return resp
+
+    def _post_json(self, path: str, payload: dict):
+        return json.loads(self._post(path, payload).read())
+
+    def load_backend_json(self, path=None, index=0) -> dict:
+        return self._post_json("/scenario", {"scenario_index": index})
+
+    def route_support_info(self, user_input: str, scenario_index: int = 0) -> SimpleNamespace:
+        return SimpleNamespace(**self._post_json("/route", {"input": user_input, "scenario_index": scenario_index}))
+
+    def triage_and_get_support_info(self, user_input: str, scenario_index: int = 0) -> SimpleNamespace:
+        return SimpleNamespace(**self._post_json("/triage", {"input": user_input, "scenario_index": scenario_index}))
+
+    def stream_email_draft(self, user_input: str, scenario_index: int = 0) -> Iterator[str]:
+        resp = self._post("/email", {"input": user_input, "scenario_index": scenario_index})
+        conn = self._local.conn
+        # A multi-byte character can straddle two reads.
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        finished = False
+        try:
+            while True:
+                data = resp.read1(4096)
+                if not data:
+                    finished = True
+                    tail = decoder.decode(b"", final=True)
+                    if tail:
+                        yield tail
+                    return
+                text = decoder.decode(data)
+                if text:
+                    yield text
+        finally:
+            if not finished:
+                # Abandoned or cut off mid-body: the rest of the response is
+                # still on this connection, so it can't be reused.
+                conn.close()
+                if getattr(self._local, "conn", None) is conn:
+                    self._local.conn = None
+
+    def generate_faqs(self, history: list[dict], strict: bool = False) -> list[dict]:
+        return self._post_json("/faqs", {"history": history, "strict": strict})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared RadBit triage service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=32, help="concurrent requests per process")
+    parser.add_argument("--max-queue", type=int, default=256, help="waiting requests per process before 503")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    kwargs = dict(host=args.host, port=args.port, unix_path=args.unix,
+                  workers=args.workers, max_queue=args.max_queue)
+    if args.processes > 1 and not args.unix:
+        run_processes(args.processes, **kwargs)
+    else:
+        asyncio.run(serve(**kwargs))
+
+if __name__ == "__main__":
+    main()